@@ -3,16 +3,103 @@ Neural Network Content Classifier
 Автоматическая классификация контента с помощью нейросети
 """
 
+import os
+import time
+import hashlib
 import logging
-from typing import Dict, List, Tuple
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import ahocorasick
+from sentence_transformers import SentenceTransformer
 import torch
+from config import CLASSIFIER_MODEL, CLASSIFIER_BACKEND, ONNX_CACHE_DIR
 
 logger = logging.getLogger(__name__)
 
+# Category signal lives in the title and lede, and attention cost grows with n²
+MAX_INPUT_CHARS = 2048  # Cheap pre-guard before any tokenization
+MAX_BODY_CHARS = 1500  # Body characters kept after the title line
+MAX_INPUT_TOKENS = 256  # Hard token cap passed to the encoder
+CACHE_MAX_ENTRIES = 2048  # Classification results kept in the LRU cache
+
+# Allow TF32 / reduced-precision matmuls and let cuDNN pick the fastest kernels
+torch.set_float32_matmul_precision('high')
+torch.backends.cudnn.benchmark = True
+
+class OnnxSentenceEncoder:
+    """Mean-pooling sentence encoder running on ONNX Runtime with full graph fusion"""
+    
+    def __init__(self, model_name: str, cache_dir: str = ONNX_CACHE_DIR, max_seq_length: int = 128):
+        """
+        Export (or load a cached export of) a sentence-transformers model to ONNX
+        
+        Args:
+            model_name: Hugging Face model name
+            cache_dir: Directory for exported ONNX models, reused across runs
+            max_seq_length: Token limit per input (sentence-transformers default for MiniLM)
+        """
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        use_cuda = torch.cuda.is_available()
+        self.device = torch.device('cuda' if use_cuda else 'cpu')
+        self.max_seq_length = max_seq_length
+        
+        session_options = onnxruntime.SessionOptions()
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        
+        # Exports are keyed by model and accelerator so each run skips the export
+        export_dir = os.path.join(
+            cache_dir, model_name.replace('/', '__') + ('-cuda' if use_cuda else '-cpu')
+        )
+        exported = os.path.isdir(export_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            export_dir if exported else model_name,
+            export=not exported,
+            provider="CUDAExecutionProvider" if use_cuda else "CPUExecutionProvider",
+            session_options=session_options
+        )
+        if not exported:
+            self.model.save_pretrained(export_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+    
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs):
+        """Encode one text or a list of texts; always returns a tensor like convert_to_tensor=True"""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        
+        chunks = []
+        for start in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors='pt'
+            ).to(self.device)
+            hidden = self.model(**inputs).last_hidden_state
+            # Mean pooling over non-padding tokens, as sentence-transformers does
+            mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            chunks.append((hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9))
+        
+        embeddings = torch.cat(chunks)
+        if normalize_embeddings:
+            embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        return embeddings[0] if single else embeddings
+
 class ContentClassifier:
-    def __init__(self):
-        """Initialize the classifier with pre-trained model"""
+    def __init__(self, model_name: str = CLASSIFIER_MODEL, use_model: bool = True,
+                 backend: str = CLASSIFIER_BACKEND):
+        """
+        Initialize the classifier; the neural model is loaded on first use
+        
+        Args:
+            model_name: Sentence-transformers model name for embeddings
+            use_model: If False, never load the model and use keyword matching only
+            backend: "torch" for SentenceTransformer, "onnx" for ONNX Runtime
+        """
         self.categories = {
             "🚀 НОВЫЙ РЕЛИЗ": [
                 "релиз новой модели", "запуск продукта", "выпуск обновления", 
@@ -77,65 +164,200 @@ class ContentClassifier:
             ]
         }
         
-        self.classifier = None
-        self.model_name = "facebook/bart-large-mnli"
-        self._load_model()
+        # Categories are fixed after init, so derive the lookup tables once
+        self._candidate_labels = tuple(self.categories.keys())
+        self._flat_keywords = tuple(
+            (category, keyword.casefold())
+            for category, keywords in self.categories.items()
+            for keyword in keywords
+        )
+        self._build_keyword_automaton()
+        
+        self.use_model = use_model
+        self.model = None
+        self.label_matrix = None
+        self._model_loaded = False
+        # Raw model results keyed by a hash of the input text
+        self._cache: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+        self.model_name = model_name
+        self.backend = backend
     
     def _load_model(self):
-        """Load the pre-trained model for zero-shot classification"""
+        """Load the sentence embedding model and pre-embed category prototypes"""
         try:
-            logger.info("Loading zero-shot classification model...")
-            self.classifier = pipeline(
-                "zero-shot-classification",
-                model=self.model_name,
-                device=0 if torch.cuda.is_available() else -1
+            logger.info("Loading sentence embedding model...")
+            torch.set_num_threads(os.cpu_count() or 1)
+            if self.backend == "onnx":
+                self.model = OnnxSentenceEncoder(self.model_name)
+            else:
+                self.model = SentenceTransformer(
+                    self.model_name,
+                    device='cuda' if torch.cuda.is_available() else 'cpu'
+                )
+                
+                # Half precision on GPU uses Tensor Cores and halves memory traffic;
+                # on CPU, int8 dynamic quantization of the Linear layers hits VNNI kernels
+                if torch.cuda.is_available():
+                    self.model.half()
+                    self._compile_model()
+                else:
+                    torch.quantization.quantize_dynamic(
+                        self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                    )
+            
+            # Each category is represented by a single prototype vector built
+            # from its keywords, so classification is one encode + dot products
+            prototypes = [" ; ".join(keywords) for keywords in self.categories.values()]
+            label_embeddings = self.model.encode(
+                prototypes,
+                normalize_embeddings=True,
+                convert_to_tensor=True
             )
+            # Never encode more than MAX_INPUT_TOKENS tokens per text
+            self.model.max_seq_length = min(self.model.max_seq_length, MAX_INPUT_TOKENS)
+            
+            # Keep prototypes resident on the model's device and dtype, already
+            # laid out as (dim, labels) so every call is a single matmul
+            self.label_matrix = label_embeddings.T.contiguous()
+            self._warm_up()
             logger.info("Model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading model: {e}")
-            self.classifier = None
+            self.model = None
+            self.label_matrix = None
+    
+    def _ensure_model(self) -> bool:
+        """Load the model on first use and report whether the neural path is available"""
+        if self.use_model and not self._model_loaded:
+            self._load_model()
+            self._model_loaded = True
+        return self.model is not None
+    
+    def _compile_model(self):
+        """Compile the underlying transformer with torch.compile, keeping eager mode on failure"""
+        transformer = self.model[0]
+        eager_model = transformer.auto_model
+        try:
+            # dynamic=True avoids recompiling for every padded sequence length
+            transformer.auto_model = torch.compile(eager_model, dynamic=True, fullgraph=False)
+            self.model.encode("compile", convert_to_tensor=True)
+            logger.info("Classifier model compiled with torch.compile")
+        except Exception as e:
+            logger.warning(f"torch.compile failed, using eager model: {e}")
+            transformer.auto_model = eager_model
+    
+    def _warm_up(self):
+        """Run dummy inferences so the first real call doesn't pay for lazy initialization"""
+        try:
+            start = time.perf_counter()
+            # Cover a short and a full-length input on both the single and batch paths
+            long_text = " ".join(["warm up"] * MAX_INPUT_TOKENS)
+            for _ in range(2):
+                for sample in ("warm up", long_text):
+                    self.model.encode(sample, normalize_embeddings=True, convert_to_tensor=True)
+                self.model.encode(
+                    ["warm up", long_text],
+                    batch_size=32,
+                    normalize_embeddings=True,
+                    convert_to_tensor=True
+                )
+            logger.info(f"Classifier warm-up finished in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            logger.warning(f"Classifier warm-up failed: {e}")
     
-    def _prepare_candidate_labels(self) -> List[str]:
+    def _prepare_candidate_labels(self) -> Tuple[str, ...]:
         """Prepare candidate labels for classification"""
-        return list(self.categories.keys())
+        return self._candidate_labels
     
-    def _enhance_text_with_keywords(self, text: str) -> str:
-        """Enhance text with relevant keywords for better classification"""
-        enhanced_text = text.lower()
-        
-        # Add context based on keywords
-        for category, keywords in self.categories.items():
-            for keyword in keywords:
-                if keyword.lower() in enhanced_text:
-                    enhanced_text += f" {keyword}"
-        
-        return enhanced_text
+    def _build_keyword_automaton(self):
+        """Compile all casefolded category keywords into a single Aho-Corasick automaton"""
+        self._keyword_automaton = ahocorasick.Automaton()
+        for _, keyword_lower in self._flat_keywords:
+            self._keyword_automaton.add_word(keyword_lower, keyword_lower)
+        self._keyword_automaton.make_automaton()
+    
+    def _match_keywords(self, text: str) -> Set[str]:
+        """Casefold the text once and return all keywords found in it in one linear scan"""
+        return {keyword for _, keyword in self._keyword_automaton.iter(text.casefold())}
+    
+    def _prepare_input(self, text: str) -> str:
+        """Keep the title line plus the start of the body for the encoder"""
+        title, _, body = text[:MAX_INPUT_CHARS].partition('\n')
+        return f"{title}\n{body[:MAX_BODY_CHARS]}" if body else title
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Build a compact cache key for the input text"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
     
-    def classify_content(self, text: str, confidence_threshold: float = 0.3) -> Tuple[str, float]:
+    def _cache_get(self, key: bytes) -> Optional[Tuple[str, float]]:
+        """Return a cached result and mark it as most recently used"""
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+        return cached
+    
+    def _cache_put(self, key: bytes, value: Tuple[str, float]):
+        """Store a result, evicting the least recently used entry when full"""
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+    
+    def cache_size(self) -> int:
+        """Number of classification results currently cached"""
+        return len(self._cache)
+    
+    @staticmethod
+    def _compose_text(title: str, content: str, prefix_chars: int) -> str:
+        """Join the title with the first prefix_chars of content, skipping the copy when there is no content"""
+        if not content:
+            return title
+        return f"{title}\n{content[:prefix_chars]}"
+    
+    def classify_content(self, title: str, content: str = "", prefix_chars: int = 200,
+                         confidence_threshold: float = 0.3) -> Tuple[str, float]:
         """
-        Classify content using zero-shot classification
+        Classify content by cosine similarity to category prototypes
         
         Args:
-            text: Input text to classify
+            title: Article title, or the whole text when content is empty
+            content: Article body, only its first prefix_chars characters are used
+            prefix_chars: Number of content characters passed to the classifier
             confidence_threshold: Minimum confidence score
             
         Returns:
             Tuple of (category, confidence_score)
         """
-        if not self.classifier:
-            logger.warning("Classifier not loaded, using fallback classification")
+        text = self._compose_text(title, content, prefix_chars)
+        
+        if not self._ensure_model():
+            if self.use_model:
+                logger.warning("Classifier not loaded, using fallback classification")
             return self._fallback_classify(text)
         
         try:
-            # Prepare text and labels
-            enhanced_text = self._enhance_text_with_keywords(text)
-            candidate_labels = self._prepare_candidate_labels()
-            
-            # Perform classification
-            result = self.classifier(enhanced_text, candidate_labels)
+            key = self._cache_key(text)
+            cached = self._cache_get(key)
             
-            best_label = result['labels'][0]
-            best_score = result['scores'][0]
+            if cached is not None:
+                best_label, best_score = cached
+            else:
+                # Prepare text and labels
+                candidate_labels = self._prepare_candidate_labels()
+                
+                # Single forward pass, then similarity against all prototypes
+                embedding = self.model.encode(
+                    self._prepare_input(text),
+                    normalize_embeddings=True,
+                    convert_to_tensor=True
+                )
+                scores = embedding @ self.label_matrix
+                best_index = int(torch.argmax(scores))
+                
+                best_label = candidate_labels[best_index]
+                best_score = float(scores[best_index])
+                self._cache_put(key, (best_label, best_score))
             
             logger.info(f"Classification result: {best_label} (confidence: {best_score:.3f})")
             
@@ -154,33 +376,96 @@ class ContentClassifier:
         """
         Fallback classification using keyword matching
         """
-        text_lower = text.lower()
+        matched = self._match_keywords(text)
         
         # Keyword-based classification
-        for category, keywords in self.categories.items():
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
+        if matched:
+            # Flat table keeps category order, so the first hit wins as before
+            for category, keyword in self._flat_keywords:
+                if keyword in matched:
                     return category, 0.8  # High confidence for keyword match
         
         # Default category
         return "📄 НОВОЕ ИССЛЕДОВАНИЕ", 0.5
     
-    def classify_batch(self, texts: List[str]) -> List[Tuple[str, float]]:
+    def classify_batch(self, titles: List[str], contents: Optional[List[str]] = None,
+                       prefix_chars: int = 200, confidence_threshold: float = 0.3,
+                       batch_size: int = 32) -> List[Tuple[str, float]]:
         """
-        Classify multiple texts at once
+        Classify multiple texts at once in a single batched forward pass
         
         Args:
-            texts: List of texts to classify
+            titles: List of titles, or whole texts when contents is not given
+            contents: Optional list of bodies matching titles
+            prefix_chars: Number of content characters passed to the classifier
+            confidence_threshold: Minimum confidence score
+            batch_size: Number of texts encoded per model call
             
         Returns:
             List of (category, confidence) tuples
         """
-        results = []
-        for text in texts:
-            result = self.classify_content(text)
-            results.append(result)
+        if not titles:
+            return []
         
-        return results
+        if contents is None:
+            texts = list(titles)
+        else:
+            texts = [
+                self._compose_text(title, content, prefix_chars)
+                for title, content in zip(titles, contents)
+            ]
+        
+        if not self._ensure_model():
+            if self.use_model:
+                logger.warning("Classifier not loaded, using fallback classification")
+            return [self._fallback_classify(text) for text in texts]
+        
+        try:
+            keys = [self._cache_key(text) for text in texts]
+            # Only texts not seen before go through the model
+            resolved: Dict[bytes, Tuple[str, float]] = {}
+            missing_by_key: Dict[bytes, str] = {}
+            for key, text in zip(keys, texts):
+                if key in resolved or key in missing_by_key:
+                    continue
+                cached = self._cache_get(key)
+                if cached is not None:
+                    resolved[key] = cached
+                else:
+                    missing_by_key[key] = text
+            missing = list(missing_by_key.items())
+            
+            if missing:
+                candidate_labels = self._prepare_candidate_labels()
+                
+                # One padded encode for the whole batch, one matmul against prototypes
+                embeddings = self.model.encode(
+                    [self._prepare_input(text) for _, text in missing],
+                    batch_size=batch_size,
+                    normalize_embeddings=True,
+                    convert_to_tensor=True
+                )
+                scores = embeddings @ self.label_matrix
+                best_scores, best_indices = scores.max(dim=1)
+                
+                for (key, _), best_index, best_score in zip(missing, best_indices.tolist(), best_scores.tolist()):
+                    resolved[key] = (candidate_labels[best_index], best_score)
+                    self._cache_put(key, resolved[key])
+            
+            results = []
+            for key, text in zip(keys, texts):
+                best_label, best_score = resolved[key]
+                if best_score >= confidence_threshold:
+                    results.append((best_label, best_score))
+                else:
+                    results.append(self._fallback_classify(text))
+            
+            logger.info(f"Classified batch of {len(texts)} texts")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error during batch classification: {e}")
+            return [self._fallback_classify(text) for text in texts]
     
     def get_categories_info(self) -> Dict[str, List[str]]:
         """Get information about available categories"""
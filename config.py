@@ -3,6 +3,8 @@ Configuration file for AI News Scraper and Telegram Publisher
 """
 
 import os
+import json
+from functools import lru_cache
 from typing import List, Dict
 from dotenv import load_dotenv
 
@@ -10,8 +12,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Telegram Configuration
-TELEGRAM_BOT_TOKEN = "7542441675:AAHp4-AhVVydGsuSutxwJKVEp6EpJkQ-brk"
-TELEGRAM_CHAT_ID = -1002717964198
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+TELEGRAM_CHAT_ID = int(os.getenv("TELEGRAM_CHAT_ID", "-1002717964198"))
+# Telegram allows ~30 msg/s per bot but only ~1 msg/s into a single chat
+TELEGRAM_RATE_LIMIT = float(os.getenv("TELEGRAM_RATE_LIMIT", "1"))  # Messages per TELEGRAM_RATE_PERIOD
+TELEGRAM_RATE_PERIOD = 1.0  # Seconds
+ARTICLE_QUEUE_SIZE = 4  # Summarized articles waiting to be published
+SUMMARY_BATCH_SIZE = 8  # Articles summarized per batched model call
 
 # Database Configuration
 DATABASE_PATH = "news_articles.db"
@@ -19,132 +26,43 @@ DATABASE_PATH = "news_articles.db"
 # Scraping Configuration
 REQUEST_DELAY = 2  # Delay between requests in seconds
 REQUEST_TIMEOUT = 30  # Timeout for HTTP requests
+MAX_PAGE_BYTES = 2 * 1024 * 1024  # Pages larger than this once decoded are skipped
 MAX_RETRIES = 3  # Maximum number of retries for failed requests
+HOST_CONCURRENCY = 8  # Concurrent page fetches per host
+HTTP_CACHE_DIR = ".http_cache"  # On-disk cache of fetched pages
+HTTP_CACHE_TTL = 7 * 24 * 3600  # Seconds before a cached page is evicted
 MAX_ARTICLE_AGE_DAYS = 14  # Maximum age of articles in days (2 weeks)
 
 # User Agent for requests
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
-# News Sources Configuration
-NEWS_SOURCES = {
-    "venturebeat": {
-        "name": "VentureBeat AI",
-        "url": "https://venturebeat.com/category/ai/",
-        "article_links_selector": "article a",
-        "title_selector": "h1.entry-title, h1",
-        "content_selector": ".entry-content p, .post-content p, .article-content p",
-        "date_selector": "time, .entry-date, .post-date, .published-date",
-        "base_url": "https://venturebeat.com"
-    },
-    "scmp": {
-        "name": "SCMP Tech",
-        "url": "https://www.scmp.com/tech",
-        "article_links_selector": "a[href*='/article/']",
-        "title_selector": "h1, .article__headline",
-        "content_selector": "article p",
-        "date_selector": "time, .published-date, .article__date, .date",
-        "base_url": "https://www.scmp.com"
-    },
-    "artificialintelligence_news": {
-        "name": "AI News",
-        "url": "https://artificialintelligence-news.com/",
-        "article_links_selector": "a[href*='/news/']",
-        "title_selector": "h1.entry-title, h1",
-        "content_selector": ".entry-content p, .post-content p",
-        "date_selector": "time, .entry-date, .post-date, .published-date",
-        "base_url": "https://artificialintelligence-news.com"
-    },
-    "theverge_ai": {
-        "name": "The Verge AI",
-        "url": "https://www.theverge.com/ai-artificial-intelligence",
-        "article_links_selector": "a[data-analytics-link='article']",
-        "title_selector": "h1, .c-page-title",
-        "content_selector": ".c-entry-content p, .e-content p",
-        "date_selector": "time, .c-byline__item, .published-date",
-        "base_url": "https://www.theverge.com"
-    },
-    "epoch_ai_data": {
-        "name": "Epoch AI - Data Insights",
-        "url": "https://epoch.ai/data-insights",
-        "article_links_selector": "a[href*='/data-insights/']",
-        "title_selector": "h1, .post-title, .entry-title",
-        "content_selector": ".post-content p, .entry-content p, .content p",
-        "date_selector": "time, .post-date, .published-date, .date",
-        "base_url": "https://epoch.ai"
-    },
-    "epoch_ai_blog": {
-        "name": "Epoch AI - Blog",
-        "url": "https://epoch.ai/blog",
-        "article_links_selector": "a[href*='/blog/']",
-        "title_selector": "h1, .post-title, .entry-title",
-        "content_selector": ".post-content p, .entry-content p, .content p",
-        "date_selector": "time, .post-date, .published-date, .date",
-        "base_url": "https://epoch.ai"
-    },
-    "epoch_ai_gradient": {
-        "name": "Epoch AI - Gradient Updates",
-        "url": "https://epoch.ai/gradient-updates",
-        "article_links_selector": "a[href*='/gradient-updates/']",
-        "title_selector": "h1, .post-title, .entry-title",
-        "content_selector": ".post-content p, .entry-content p, .content p",
-        "date_selector": "time, .post-date, .published-date, .date",
-        "base_url": "https://epoch.ai"
-    },
-    "metr_research": {
-        "name": "METR Research",
-        "url": "https://metr.org/research/",
-        "article_links_selector": "a[href*='/research/']",
-        "title_selector": "h1, .post-title, .entry-title",
-        "content_selector": ".post-content p, .entry-content p, .content p",
-        "date_selector": "time, .post-date, .published-date, .date",
-        "base_url": "https://metr.org"
-    },
-    "techxplore": {
-        "name": "TechXplore Latest News",
-        "url": "https://techxplore.com/latest-news/",
-        "article_links_selector": "a[href*='/news/']",
-        "title_selector": "h1, .news-article-title",
-        "content_selector": ".news-article-content p, .article-content p",
-        "date_selector": "time, .news-date, .published-date, .date",
-        "base_url": "https://techxplore.com"
-    },
-    "forbes_innovation": {
-        "name": "Forbes Innovation",
-        "url": "https://www.forbes.com/innovation/",
-        "article_links_selector": "a[href*='/innovation/']",
-        "title_selector": "h1, .headline",
-        "content_selector": ".article-body p, .entry-content p",
-        "date_selector": "time, .published-date, .date, .timestamp",
-        "base_url": "https://www.forbes.com"
-    },
-    "forbes_ai": {
-        "name": "Forbes AI",
-        "url": "https://www.forbes.com/ai/",
-        "article_links_selector": "a[href*='/ai/']",
-        "title_selector": "h1, .headline",
-        "content_selector": ".article-body p, .entry-content p",
-        "date_selector": "time, .published-date, .date, .timestamp",
-        "base_url": "https://www.forbes.com"
-    },
-    "sakana_ai": {
-        "name": "Sakana AI Blog",
-        "url": "https://sakana.ai/blog/",
-        "article_links_selector": "a[href*='/blog/']",
-        "title_selector": "h1, .post-title, .entry-title",
-        "content_selector": ".post-content p, .entry-content p, .content p",
-        "date_selector": "time, .post-date, .published-date, .date",
-        "base_url": "https://sakana.ai"
-    },
-    "interesting_engineering": {
-        "name": "Interesting Engineering - Innovation",
-        "url": "https://interestingengineering.com/innovation",
-        "article_links_selector": "a[href*='/innovation/']",
-        "title_selector": "h1, .article-title",
-        "content_selector": "article p",
-        "date_selector": "time, .article-date, .published-date, .date",
-        "base_url": "https://interestingengineering.com"
-    }
-}
+# News Sources Configuration (see news_sources.json)
+NEWS_SOURCES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_sources.json")
+
+@lru_cache(maxsize=1)
+def get_news_sources() -> Dict[str, Dict]:
+    """Load news sources from JSON once"""
+    with open(NEWS_SOURCES_PATH, encoding='utf-8') as f:
+        sources = json.load(f)
+    
+    return sources
+
+# Summarizer Configuration
+# DistilBART keeps BART's tokenizer and 1024-token context at about half the decoder cost;
+# set "facebook/bart-large-cnn" for the larger model
+SUMMARIZER_MODEL = os.getenv("SUMMARIZER_MODEL", "sshleifer/distilbart-cnn-12-6")
+# "torch" (default) or "onnx" to summarize on CPU with an int8-quantized ONNX Runtime export
+SUMMARIZER_BACKEND = os.getenv("SUMMARIZER_BACKEND", "torch")
+
+# Classifier Configuration
+# Any sentence-transformers model works; the default is small and multilingual (RU + EN)
+CLASSIFIER_MODEL = os.getenv(
+    "CLASSIFIER_MODEL",
+    "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+)
+# "torch" (default) or "onnx" to run the classifier on ONNX Runtime with fused kernels
+CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", "torch")
+ONNX_CACHE_DIR = "onnx_models"  # Exported ONNX models, reused across runs
 
 # Telegram Message Format
 MESSAGE_TEMPLATE = """*{title}*
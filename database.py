@@ -2,62 +2,122 @@
 Database module for storing processed article URLs
 """
 
+import atexit
+import hashlib
 import sqlite3
 import logging
-from typing import List, Optional
+import weakref
+from contextlib import contextmanager
+from typing import List, Optional, Set, Tuple
 from config import DATABASE_PATH
 
 logger = logging.getLogger(__name__)
 
+# Stay below SQLite's default limit of 999 bound parameters per statement
+SQL_PARAMS_CHUNK = 900
+
+def url_hash(url: str) -> int:
+    """Hash a URL into a positive 63-bit integer used as the primary key"""
+    digest = hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') & 0x7FFFFFFFFFFFFFFF
+
+# Instances still open at interpreter exit; weak so the registry never keeps a connection alive
+_open_databases: "weakref.WeakSet[NewsDatabase]" = weakref.WeakSet()
+
+@atexit.register
+def _close_open_databases():
+    """Flush and close every database still open at exit"""
+    for database in list(_open_databases):
+        database.close()
+
 class NewsDatabase:
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db_path = db_path
+        # Rows queued by mark_article_processed_buffered until the next flush()
+        self._pending_inserts: List[Tuple[str, str, str]] = []
+        self._pending_urls: Set[str] = set()
+        # Single persistent connection in autocommit mode, reused by every method
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-65536;"
+        )
+        self._conn.create_function("url_hash", 1, url_hash, deterministic=True)
+        _open_databases.add(self)
         self.init_database()
     
+    def close(self):
+        """Flush buffered writes and close the database connection"""
+        _open_databases.discard(self)
+        try:
+            self.flush()
+            self._conn.close()
+        except Exception as e:
+            logger.error(f"Error closing database: {e}")
+    
     def init_database(self):
         """Initialize the database with required tables"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Create table for processed articles
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS processed_articles (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        url TEXT UNIQUE NOT NULL,
-                        title TEXT,
-                        source TEXT NOT NULL,
-                        processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # Create index for faster URL lookups
-                cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_url ON processed_articles(url)
-                ''')
-                
-                # Create table for storing last tweet id per user
+            cursor = self._conn.cursor()
+            
+            # Migrate tables created before URLs were keyed by hash
+            cursor.execute("PRAGMA table_info(processed_articles)")
+            columns = [row[1] for row in cursor.fetchall()]
+            needs_migration = bool(columns) and 'url_hash' not in columns
+            
+            cursor.execute("BEGIN")
+            if needs_migration:
+                logger.info("Migrating processed_articles to url_hash primary key")
+                cursor.execute("ALTER TABLE processed_articles RENAME TO processed_articles_old")
+            
+            # Create table for processed articles, keyed by an integer hash of the URL
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS processed_articles (
+                    url_hash INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    source TEXT NOT NULL,
+                    processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            if needs_migration:
                 cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS twitter_state (
-                        user_id TEXT PRIMARY KEY,
-                        last_tweet_id TEXT
-                    )
+                    INSERT OR IGNORE INTO processed_articles (url_hash, url, title, source, processed_at)
+                    SELECT url_hash(url), url, title, source, processed_at FROM processed_articles_old
                 ''')
-                
-                conn.commit()
-                logger.info("Database initialized successfully")
-                
+                cursor.execute("DROP TABLE processed_articles_old")
+            
+            # Create table for storing last tweet id per user
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS twitter_state (
+                    user_id TEXT PRIMARY KEY,
+                    last_tweet_id TEXT
+                )
+            ''')
+            cursor.execute("COMMIT")
+            
+            logger.info("Database initialized successfully")
+            
         except Exception as e:
+            if self._conn.in_transaction:
+                self._conn.rollback()
             logger.error(f"Error initializing database: {e}")
             raise
     
     def is_article_processed(self, url: str) -> bool:
         """Check if an article URL has been processed before"""
+        if url in self._pending_urls:
+            return True
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT 1 FROM processed_articles WHERE url = ?", (url,))
-                return cursor.fetchone() is not None
+            cursor = self._conn.cursor()
+            cursor.execute(
+                "SELECT 1 FROM processed_articles WHERE url_hash = ? AND url = ?",
+                (url_hash(url), url)
+            )
+            return cursor.fetchone() is not None
         except Exception as e:
             logger.error(f"Error checking if article is processed: {e}")
             return False
@@ -65,29 +125,85 @@ class NewsDatabase:
     def mark_article_processed(self, url: str, title: str, source: str):
         """Mark an article as processed"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO processed_articles (url, title, source) VALUES (?, ?, ?)",
-                    (url, title, source)
-                )
-                conn.commit()
-                logger.info(f"Marked article as processed: {url}")
+            cursor = self._conn.cursor()
+            cursor.execute(
+                "INSERT INTO processed_articles (url_hash, url, title, source) VALUES (?, ?, ?, ?)",
+                (url_hash(url), url, title, source)
+            )
+            logger.info(f"Marked article as processed: {url}")
         except sqlite3.IntegrityError:
             logger.warning(f"Article already exists in database: {url}")
         except Exception as e:
             logger.error(f"Error marking article as processed: {e}")
     
+    def filter_unprocessed(self, urls: List[str]) -> Set[str]:
+        """Return the subset of URLs that have not been processed yet"""
+        processed = set()
+        try:
+            cursor = self._conn.cursor()
+            for start in range(0, len(urls), SQL_PARAMS_CHUNK):
+                chunk = urls[start:start + SQL_PARAMS_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"SELECT url FROM processed_articles WHERE url_hash IN ({placeholders})",
+                    [url_hash(url) for url in chunk]
+                )
+                processed.update(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            logger.error(f"Error filtering processed articles: {e}")
+        return set(urls) - processed - self._pending_urls
+    
+    def mark_articles_processed(self, rows: List[Tuple[str, str, str]]):
+        """Mark several (url, title, source) rows as processed in a single transaction"""
+        if not rows:
+            return
+        try:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO processed_articles (url_hash, url, title, source) VALUES (?, ?, ?, ?)",
+                [(url_hash(url), url, title, source) for url, title, source in rows]
+            )
+            cursor.execute("COMMIT")
+            logger.info(f"Marked {len(rows)} articles as processed")
+        except Exception as e:
+            if self._conn.in_transaction:
+                self._conn.rollback()
+            logger.error(f"Error marking articles as processed: {e}")
+    
+    def mark_article_processed_buffered(self, url: str, title: str, source: str):
+        """Queue an article to be marked as processed on the next flush()"""
+        if url in self._pending_urls:
+            return
+        self._pending_urls.add(url)
+        self._pending_inserts.append((url, title, source))
+    
+    def flush(self):
+        """Write all buffered processed articles in a single transaction"""
+        if not self._pending_inserts:
+            return
+        rows = self._pending_inserts
+        self._pending_inserts = []
+        self._pending_urls = set()
+        self.mark_articles_processed(rows)
+    
+    @contextmanager
+    def buffered_writes(self):
+        """Flush buffered writes when the block exits, even if it raised"""
+        try:
+            yield self
+        finally:
+            self.flush()
+    
     def get_processed_count(self, source: Optional[str] = None) -> int:
         """Get count of processed articles, optionally filtered by source"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                if source:
-                    cursor.execute("SELECT COUNT(*) FROM processed_articles WHERE source = ?", (source,))
-                else:
-                    cursor.execute("SELECT COUNT(*) FROM processed_articles")
-                return cursor.fetchone()[0]
+            cursor = self._conn.cursor()
+            if source:
+                cursor.execute("SELECT COUNT(*) FROM processed_articles WHERE source = ?", (source,))
+            else:
+                cursor.execute("SELECT COUNT(*) FROM processed_articles")
+            return cursor.fetchone()[0]
         except Exception as e:
             logger.error(f"Error getting processed count: {e}")
             return 0
@@ -95,13 +211,12 @@ class NewsDatabase:
     def get_recent_articles(self, limit: int = 10) -> List[tuple]:
         """Get recent processed articles"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT url, title, source, processed_at FROM processed_articles ORDER BY processed_at DESC LIMIT ?",
-                    (limit,)
-                )
-                return cursor.fetchall()
+            cursor = self._conn.cursor()
+            cursor.execute(
+                "SELECT url, title, source, processed_at FROM processed_articles ORDER BY processed_at DESC LIMIT ?",
+                (limit,)
+            )
+            return cursor.fetchall()
         except Exception as e:
             logger.error(f"Error getting recent articles: {e}")
             return []
@@ -109,11 +224,10 @@ class NewsDatabase:
     def get_last_tweet_id(self, user_id: str) -> Optional[str]:
         """Get the last processed tweet ID for a Twitter user"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT last_tweet_id FROM twitter_state WHERE user_id = ?", (user_id,))
-                row = cursor.fetchone()
-                return row[0] if row else None
+            cursor = self._conn.cursor()
+            cursor.execute("SELECT last_tweet_id FROM twitter_state WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
         except Exception as e:
             logger.error(f"Error getting last tweet id: {e}")
             return None
@@ -121,25 +235,21 @@ class NewsDatabase:
     def set_last_tweet_id(self, user_id: str, tweet_id: str):
         """Set the last processed tweet ID for a Twitter user"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO twitter_state (user_id, last_tweet_id) VALUES (?, ?) "
-                    "ON CONFLICT(user_id) DO UPDATE SET last_tweet_id=excluded.last_tweet_id",
-                    (user_id, tweet_id)
-                )
-                conn.commit()
-                logger.info(f"Set last tweet id for user {user_id}: {tweet_id}")
+            cursor = self._conn.cursor()
+            cursor.execute(
+                "INSERT INTO twitter_state (user_id, last_tweet_id) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET last_tweet_id=excluded.last_tweet_id",
+                (user_id, tweet_id)
+            )
+            logger.info(f"Set last tweet id for user {user_id}: {tweet_id}")
         except Exception as e:
             logger.error(f"Error setting last tweet id: {e}")
     
     def clear_last_tweet_id(self, user_id: str):
         """Clear the last processed tweet ID for a Twitter user (for testing)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM twitter_state WHERE user_id = ?", (user_id,))
-                conn.commit()
-                logger.info(f"Cleared last tweet id for user {user_id}")
+            cursor = self._conn.cursor()
+            cursor.execute("DELETE FROM twitter_state WHERE user_id = ?", (user_id,))
+            logger.info(f"Cleared last tweet id for user {user_id}")
         except Exception as e:
             logger.error(f"Error clearing last tweet id: {e}") 
\ No newline at end of file
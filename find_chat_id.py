@@ -1,11 +1,16 @@
 import asyncio
 from aiogram import Bot
+from config import TELEGRAM_BOT_TOKEN
 
-# Bot token
-BOT_TOKEN = "7542441675:AAHp4-AhVVydGsuSutxwJKVEp6EpJkQ-brk"
+# Bot token, read from the environment (.env) by config
+BOT_TOKEN = TELEGRAM_BOT_TOKEN
 
 async def find_chat_info():
     """Find information about available chats"""
+    if not BOT_TOKEN:
+        print("❌ TELEGRAM_BOT_TOKEN is not set. Add it to your .env file.")
+        return
+
     bot = Bot(token=BOT_TOKEN)
     
     try:
@@ -5,17 +5,23 @@ AI News Scraper and Telegram Publisher - Main Application
 import asyncio
 import logging
 import sys
-import json
-from datetime import datetime
-from typing import List, Dict
+import time
+from typing import List, Dict, Tuple
 
-from config import LOG_LEVEL, LOG_FORMAT, X_USERNAME, X_USER_ID
+from aiolimiter import AsyncLimiter
+
+from config import (
+    LOG_LEVEL, LOG_FORMAT, X_USERNAME, X_USER_ID,
+    TELEGRAM_RATE_LIMIT, TELEGRAM_RATE_PERIOD, ARTICLE_QUEUE_SIZE,
+    SUMMARY_BATCH_SIZE
+)
 from database import NewsDatabase
-from scraper import NewsScraper, TwitterFetcher
-from telegram_publisher import TelegramPublisher
+from scraper import NewsScraper, TwitterFetcher, canonicalize_url
+from telegram_publisher import get_publisher
 from classifier import ContentClassifier
 from summarizer import NewsSummarizer
 import httpx
+import orjson
 
 # Configure logging
 logging.basicConfig(
@@ -29,63 +35,173 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Sample articles used when sources return nothing and by --send-test-news
+SAMPLE_ARTICLES: Tuple[Dict, ...] = (
+    {
+        'title': 'OpenAI Launches GPT-5 with Revolutionary Multimodal Capabilities',
+        'content': 'OpenAI has announced the release of GPT-5, featuring groundbreaking multimodal capabilities that can process text, images, audio, and video simultaneously. The new model represents a significant advancement in artificial intelligence technology.',
+        'source': 'Sample Tech News',
+        'url': 'https://example.com/gpt5-launch'
+    },
+    {
+        'title': 'Google DeepMind Publishes Research on Quantum AI Breakthrough',
+        'content': 'Researchers at Google DeepMind have published a groundbreaking study demonstrating how quantum computing can accelerate machine learning algorithms. The research shows promising results for solving complex optimization problems.',
+        'source': 'Sample AI Research',
+        'url': 'https://example.com/deepmind-quantum'
+    },
+    {
+        'title': 'Meta CEO Mark Zuckerberg Announces $50 Billion AI Investment',
+        'content': 'Meta CEO Mark Zuckerberg revealed plans to invest $50 billion in artificial intelligence research and development over the next five years. The investment will focus on developing next-generation AI models and infrastructure.',
+        'source': 'Sample Business News',
+        'url': 'https://example.com/meta-investment'
+    },
+    {
+        'title': 'Microsoft Releases Major Update to Azure AI Services',
+        'content': 'Microsoft has rolled out a comprehensive update to its Azure AI services, introducing new machine learning tools and enhanced natural language processing capabilities. The update includes improved integration with existing Microsoft products.',
+        'source': 'Sample Tech Updates',
+        'url': 'https://example.com/azure-update'
+    },
+    {
+        'title': 'Stanford Researchers Develop New AI Model for Drug Discovery',
+        'content': 'A team of researchers at Stanford University has developed an innovative AI model that can predict drug interactions and accelerate the drug discovery process. The model has shown promising results in preliminary tests.',
+        'source': 'Sample Research News',
+        'url': 'https://example.com/stanford-drug-ai'
+    }
+)
+
 class AINewsScraperApp:
-    def __init__(self):
+    def __init__(self, skip_classifier: bool = False):
         self.database = NewsDatabase()
-        self.scraper = NewsScraper()
-        self.publisher = TelegramPublisher()
-        self.classifier = ContentClassifier()
+        self.scraper = NewsScraper(database=self.database)
+        self.publisher = get_publisher()
+        self.classifier = ContentClassifier(use_model=not skip_classifier)
         self.summarizer = NewsSummarizer()
+        # One fetcher shared by every X/Twitter path, reusing the app's classifier and database
+        self.twitter_fetcher = TwitterFetcher(classifier=self.classifier, database=self.database)
+        # Shared keep-alive client so repeated API checks reuse the same TLS connection
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=httpx.Timeout(10.0),
+            http2=True
+        )
+        # Token bucket for Telegram sends; items are sent one by one to keep channel order
+        self.publish_limiter = AsyncLimiter(TELEGRAM_RATE_LIMIT, TELEGRAM_RATE_PERIOD)
     
-    async def process_articles(self, articles: List[Dict]) -> int:
-        """Process and publish articles to Telegram"""
-        published_count = 0
+    def _build_publishable_batch(self, articles: List[Dict], categories: List[str]) -> List[Dict]:
+        """Summarize a batch of articles where needed and build the payloads to publish"""
+        # Summarize articles from news sources (not X/Twitter) in one batched call
+        to_summarize = [
+            i for i, article in enumerate(articles)
+            if self.summarizer.should_summarize(article.get('source', ''))
+        ]
+        contents = [article['content'] for article in articles]
+        if to_summarize:
+            logger.info("Summarizing %s articles", len(to_summarize))
+            summaries = self.summarizer.summarize_articles(
+                [(articles[i]['title'], articles[i]['content']) for i in to_summarize],
+                batch_size=SUMMARY_BATCH_SIZE
+            )
+            for i, summary in zip(to_summarize, summaries):
+                contents[i] = summary
         
-        for article in articles:
-            # Check if article already processed
-            if self.database.is_article_processed(article['url']):
-                logger.info(f"Article already processed: {article['title']}")
-                continue
-            
-            # Classify the article
-            text_to_classify = f"{article['title']} {article['content'][:200]}"
-            category, confidence = self.classifier.classify_content(text_to_classify)
-            logger.info(f"Article classified as: {category} (confidence: {confidence:.3f})")
-            
-            # Summarize article if it's from news sources (not X/Twitter)
-            content = article['content']
-            if self.summarizer.should_summarize(article.get('source', '')):
-                logger.info(f"Summarizing article: {article['title']}")
-                content = self.summarizer.summarize_article(article['title'], article['content'])
-            
-            # Prepare article for publishing
-            article_to_publish = {
+        return [
+            {
                 'title': article['title'],
                 'content': content,
                 'source': article['source'],
                 'url': article['url'],
                 'classification': category
             }
-            
-            # Send to Telegram
-            success = await self.publisher.send_article(article_to_publish)
-            
-            if success:
-                # Mark as processed in database
-                self.database.mark_article_processed(article['url'], article['title'], article['source'])
-                published_count += 1
-                logger.info(f"Published article: {article['title']}")
-            else:
-                logger.error(f"Failed to publish article: {article['title']}")
-            
-            # Small delay between articles
-            await asyncio.sleep(1)
+            for article, content, category in zip(articles, contents, categories)
+        ]
+    
+    async def _produce_articles(self, queue: asyncio.Queue, articles: List[Dict],
+                                categories: List[str]):
+        """Summarize articles in batches in a worker thread and queue them for publishing"""
+        try:
+            for start in range(0, len(articles), SUMMARY_BATCH_SIZE):
+                batch = articles[start:start + SUMMARY_BATCH_SIZE]
+                try:
+                    # The summarizer runs off the event loop so publishing keeps going meanwhile
+                    publishables = await asyncio.to_thread(
+                        self._build_publishable_batch, batch, categories[start:start + SUMMARY_BATCH_SIZE]
+                    )
+                except Exception as e:
+                    logger.error("Error preparing %s articles: %s", len(batch), e)
+                    continue
+                for publishable in publishables:
+                    await queue.put(publishable)
+        finally:
+            # Stop marker for the consumer
+            await queue.put(None)
+    
+    async def _consume_articles(self, queue: asyncio.Queue) -> int:
+        """Publish queued articles and mark them as processed"""
+        published_count = 0
+        while (article := await queue.get()) is not None:
+            try:
+                # Send to Telegram, waiting for a free slot in the rate limiter
+                async with self.publish_limiter:
+                    success = await self.publisher.send_article(article)
+                
+                if success:
+                    # Mark as processed in database, keyed by the canonical URL
+                    self.database.mark_article_processed_buffered(
+                        canonicalize_url(article['url']), article['title'], article['source']
+                    )
+                    published_count += 1
+                    logger.info("Published article: %s", article['title'])
+                else:
+                    logger.error("Failed to publish article: %s", article['title'])
+            except Exception as e:
+                logger.error("Error publishing article %s: %s", article.get('title', 'Unknown'), e)
+        return published_count
+    
+    async def process_articles(self, articles: List[Dict]) -> int:
+        """Process and publish articles to Telegram"""
+        # Drop already processed and duplicate URLs before any work is scheduled. Rows are keyed
+        # by canonical URL; the raw link is checked too for rows stored before canonicalization
+        canonical_urls = [canonicalize_url(article['url']) for article in articles]
+        unprocessed = self.database.filter_unprocessed(
+            canonical_urls + [article['url'] for article in articles]
+        )
+        pending = []
+        seen_urls = set()
+        for article, canonical in zip(articles, canonical_urls):
+            if (canonical in seen_urls or canonical not in unprocessed
+                    or article['url'] not in unprocessed):
+                logger.info("Article already processed: %s", article['title'])
+                continue
+            seen_urls.add(canonical)
+            pending.append(article)
+        
+        if not pending:
+            return 0
+        
+        # Classify all new articles in one batched forward pass
+        classifications = self.classifier.classify_batch(
+            [article['title'] for article in pending],
+            [article['content'] for article in pending]
+        )
+        for article, (category, confidence) in zip(pending, classifications):
+            logger.info("Article classified as: %s (confidence: %.3f): %s", category, confidence, article['title'])
+        
+        # Summarization feeds a bounded queue drained by a single publisher, in scrape order
+        queue: asyncio.Queue = asyncio.Queue(maxsize=ARTICLE_QUEUE_SIZE)
+        categories = [category for category, _ in classifications]
+        
+        # Processed marks are committed once at the end of the cycle
+        with self.database.buffered_writes():
+            _, published_count = await asyncio.gather(
+                self._produce_articles(queue, pending, categories),
+                self._consume_articles(queue)
+            )
         
         return published_count
     
     async def run_scraping_cycle(self) -> Dict:
         """Run a complete scraping and publishing cycle"""
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         logger.info("🚀 Starting AI News Scraping Cycle")
         
         try:
@@ -96,19 +212,18 @@ class AINewsScraperApp:
             
             # Scrape articles from all sources (10 articles per source)
             logger.info("📰 Scraping articles from all sources...")
-            articles = self.scraper.scrape_all_sources(limit_per_source=10)
+            articles = await self.scraper.scrape_all_sources(limit_per_source=10)
             
             if not articles:
                 logger.warning("No articles found from any source")
                 return {"success": True, "articles_found": 0, "published": 0}
             
             # Process and publish articles
-            logger.info(f"📤 Processing {len(articles)} articles...")
+            logger.info("📤 Processing %s articles...", len(articles))
             published_count = await self.process_articles(articles)
             
             # Send completion status
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             
             completion_msg = (
                 f"✅ *Scraping Cycle Complete*\n\n"
@@ -129,7 +244,7 @@ class AINewsScraperApp:
             }
             
         except Exception as e:
-            logger.error(f"Error in scraping cycle: {e}")
+            logger.error("Error in scraping cycle: %s", e)
             error_msg = f"❌ *Scraping Error*\n\nError: {str(e)}"
             await self.publisher.send_status_message(error_msg)
             return {"success": False, "error": str(e)}
@@ -139,76 +254,94 @@ class AINewsScraperApp:
         result = await self.run_scraping_cycle()
         
         if result["success"]:
-            logger.info(f"✅ Cycle completed successfully: {result['published']} articles published")
+            logger.info("✅ Cycle completed successfully: %s articles published", result['published'])
         else:
-            logger.error(f"❌ Cycle failed: {result.get('error', 'Unknown error')}")
-        
-        await self.publisher.close()
+            logger.error("❌ Cycle failed: %s", result.get('error', 'Unknown error'))
     
     async def run_scheduled(self, schedule_hours: int = 1):
         """Run the main and Twitter cycles on schedule"""
-        logger.info(f"🕐 Starting scheduled scraper (every {schedule_hours} hours)")
-        schedule.every(schedule_hours).hours.do(lambda: asyncio.create_task(self.run_scraping_cycle()))
-        schedule.every(1).hours.do(lambda: asyncio.create_task(self.run_twitter_cycle()))  # Changed from 15 minutes to 1 hour
+        logger.info("🕐 Starting scheduled scraper (every %s hours)", schedule_hours)
+        # Two independent asyncio loops: no polling, and errors are logged instead of lost in orphan tasks
+        await asyncio.gather(
+            self._run_periodically(schedule_hours * 3600, self.run_scraping_cycle),
+            self._run_periodically(3600, self.process_tweets)
+        )
+    
+    async def _run_periodically(self, interval: float, job):
+        """Run a coroutine function now and then every interval seconds"""
         while True:
-            schedule.run_pending()
-            await asyncio.sleep(10)
+            try:
+                await job()
+            except Exception as e:
+                logger.error("Error in scheduled job %s: %s", job.__name__, e)
+            await asyncio.sleep(interval)
 
+    async def _send_one_tweet(self, tweet: Dict) -> bool:
+        """Publish a single tweet through the shared rate limiter"""
+        tweet_id = tweet.get("post_id", tweet.get("id"))
+        async with self.publish_limiter:
+            # For new format, we don't need to pass username separately
+            success = await self.publisher.send_tweet(tweet)
+        if success:
+            logger.info("Successfully sent tweet: %s", tweet_id)
+        else:
+            logger.error("Failed to send tweet: %s", tweet_id)
+        return success
+    
     async def process_tweets(self):
-        fetcher = TwitterFetcher()
-        publisher = self.publisher
+        fetcher = self.twitter_fetcher
         db = self.database
         try:
             tweets = await fetcher.fetch_new_tweets()
             if not tweets:
                 logger.info("No new tweets found (might be due to rate limiting or no new content)")
                 return 0
-            logger.info(f"Found {len(tweets)} new tweets to publish")
+            logger.info("Found %s new tweets to publish", len(tweets))
             sent_count = 0
-            for tweet in tweets:
-                # Always save tweet ID to prevent duplicates, regardless of send success
-                tweet_id = tweet.get("post_id", tweet.get("id"))
-                
-                # For new format, we don't need to pass username separately
-                success = await publisher.send_tweet(tweet)
-                if success:
-                    sent_count += 1
-                    logger.info(f"Successfully sent tweet: {tweet_id}")
-                else:
-                    logger.error(f"Failed to send tweet: {tweet_id}")
-                
-                # Always update last tweet ID to prevent duplicates
-                db.set_last_tweet_id(X_USER_ID, tweet_id)
-                await asyncio.sleep(1)
-            logger.info(f"Sent {sent_count}/{len(tweets)} tweets successfully")
+            newest_sent_id = None
+            try:
+                # Tweets arrive oldest first; send them in that order so the channel reads chronologically
+                for tweet in tweets:
+                    tweet_id = tweet.get("post_id", tweet.get("id"))
+                    try:
+                        if await self._send_one_tweet(tweet):
+                            sent_count += 1
+                            newest_sent_id = tweet_id
+                    except Exception as e:
+                        logger.error("Error sending tweet %s: %s", tweet_id, e)
+            finally:
+                # One write per cycle with the newest published ID, also when the loop is
+                # interrupted, so tweets that went out are not sent again
+                if newest_sent_id is not None:
+                    db.set_last_tweet_id(X_USER_ID, newest_sent_id)
+            logger.info("Sent %s/%s tweets successfully", sent_count, len(tweets))
             return sent_count
         except Exception as e:
-            logger.error(f"Error processing tweets: {e}")
+            logger.error("Error processing tweets: %s", e)
             return 0
     
     async def check_api_status(self):
         """Check X API status and rate limits"""
-        fetcher = TwitterFetcher()
+        fetcher = self.twitter_fetcher
         try:
             headers = {"Authorization": f"Bearer {fetcher.bearer_token}"}
-            async with httpx.AsyncClient(timeout=10) as client:
-                # Test basic API access
-                resp = await client.get("https://api.twitter.com/2/users/me", headers=headers)
+            # Test basic API access
+            resp = await self.http_client.get("https://api.twitter.com/2/users/me", headers=headers)
+            
+            if resp.status_code == 200:
+                logger.info("✅ X API connection successful")
+                data = resp.json()
+                logger.info("Connected as: %s", data.get('data', {}).get('username', 'Unknown'))
+            elif resp.status_code == 429:
+                retry_after = resp.headers.get('x-rate-limit-reset', 'Unknown')
+                logger.error("❌ Rate limit exceeded. Reset at: %s", retry_after)
+            elif resp.status_code == 401:
+                logger.error("❌ Invalid Bearer Token")
+            else:
+                logger.error("❌ API Error: %s - %s", resp.status_code, resp.text)
                 
-                if resp.status_code == 200:
-                    logger.info("✅ X API connection successful")
-                    data = resp.json()
-                    logger.info(f"Connected as: {data.get('data', {}).get('username', 'Unknown')}")
-                elif resp.status_code == 429:
-                    retry_after = resp.headers.get('x-rate-limit-reset', 'Unknown')
-                    logger.error(f"❌ Rate limit exceeded. Reset at: {retry_after}")
-                elif resp.status_code == 401:
-                    logger.error("❌ Invalid Bearer Token")
-                else:
-                    logger.error(f"❌ API Error: {resp.status_code} - {resp.text}")
-                    
         except Exception as e:
-            logger.error(f"❌ Connection failed: {e}")
+            logger.error("❌ Connection failed: %s", e)
     
     async def test_news_classifier(self):
         """Test classifier on real news articles"""
@@ -216,58 +349,30 @@ class AINewsScraperApp:
         print("=" * 60)
         
         # Try to get articles from sources
-        articles = self.scraper.scrape_all_sources(limit_per_source=5)
+        articles = await self.scraper.scrape_all_sources(limit_per_source=5)
         
         # If no articles found, use sample articles
         if not articles:
             print("⚠️  No articles found from sources, using sample articles")
-            articles = [
-                {
-                    'title': 'OpenAI Launches GPT-5 with Revolutionary Multimodal Capabilities',
-                    'content': 'OpenAI has announced the release of GPT-5, featuring groundbreaking multimodal capabilities that can process text, images, audio, and video simultaneously. The new model represents a significant advancement in artificial intelligence technology.',
-                    'source': 'Sample Tech News',
-                    'url': 'https://example.com/gpt5-launch'
-                },
-                {
-                    'title': 'Google DeepMind Publishes Research on Quantum AI Breakthrough',
-                    'content': 'Researchers at Google DeepMind have published a groundbreaking study demonstrating how quantum computing can accelerate machine learning algorithms. The research shows promising results for solving complex optimization problems.',
-                    'source': 'Sample AI Research',
-                    'url': 'https://example.com/deepmind-quantum'
-                },
-                {
-                    'title': 'Meta CEO Mark Zuckerberg Announces $50 Billion AI Investment',
-                    'content': 'Meta CEO Mark Zuckerberg revealed plans to invest $50 billion in artificial intelligence research and development over the next five years. The investment will focus on developing next-generation AI models and infrastructure.',
-                    'source': 'Sample Business News',
-                    'url': 'https://example.com/meta-investment'
-                },
-                {
-                    'title': 'Microsoft Releases Major Update to Azure AI Services',
-                    'content': 'Microsoft has rolled out a comprehensive update to its Azure AI services, introducing new machine learning tools and enhanced natural language processing capabilities. The update includes improved integration with existing Microsoft products.',
-                    'source': 'Sample Tech Updates',
-                    'url': 'https://example.com/azure-update'
-                },
-                {
-                    'title': 'Stanford Researchers Develop New AI Model for Drug Discovery',
-                    'content': 'A team of researchers at Stanford University has developed an innovative AI model that can predict drug interactions and accelerate the drug discovery process. The model has shown promising results in preliminary tests.',
-                    'source': 'Sample Research News',
-                    'url': 'https://example.com/stanford-drug-ai'
-                }
-            ]
+            articles = list(SAMPLE_ARTICLES)
         
-        classifier = ContentClassifier()
+        # Reuse the app classifier so its model and result cache are shared
+        classifier = self.classifier
         
         # Test on first 5 articles
         test_articles = articles[:5]
         
-        for i, article in enumerate(test_articles, 1):
+        # Classify based on title + first part of content, all articles at once
+        classifications = classifier.classify_batch(
+            [article['title'] for article in test_articles],
+            [article['content'] for article in test_articles]
+        )
+        
+        for i, (article, (category, confidence)) in enumerate(zip(test_articles, classifications), 1):
             print(f"\n📰 Article {i}:")
             print(f"Title: {article['title'][:80]}...")
             print(f"Source: {article['source']}")
             
-            # Classify based on title + first part of content
-            text_to_classify = f"{article['title']} {article['content'][:200]}"
-            category, confidence = classifier.classify_content(text_to_classify)
-            
             print(f"🏷️  Category: {category}")
             print(f"📊 Confidence: {confidence:.3f}")
             print("-" * 40)
@@ -342,7 +447,7 @@ The future of healthcare will likely be characterized by the seamless integratio
         print("🔄 Cleared last tweet ID")
         
         # Fetch tweets
-        fetcher = TwitterFetcher()
+        fetcher = self.twitter_fetcher
         tweets = await fetcher.fetch_new_tweets(max_results=30)  # Keep 30 for X as requested
         
         if not tweets:
@@ -371,9 +476,8 @@ The future of healthcare will likely be characterized by the seamless integratio
             print("-" * 40)
         
         # Export to JSON for detailed analysis
-        import json
-        with open('debug_tweets.json', 'w', encoding='utf-8') as f:
-            json.dump(tweets, f, ensure_ascii=False, indent=2)
+        with open('debug_tweets.json', 'wb') as f:
+            f.write(orjson.dumps(tweets, option=orjson.OPT_INDENT_2))
         
         print(f"\n💾 Exported {len(tweets)} tweets to debug_tweets.json")
         print("✅ Debug complete")
@@ -415,26 +519,26 @@ async def main():
     parser.add_argument("--test-summarizer", action="store_true", help="Test summarization on a sample article")
     parser.add_argument("--debug-tweets", action="store_true", help="Reset tweet ID and fetch fresh tweets for media debugging")
     parser.add_argument("--test-media-account", type=str, help="Test media from specific Twitter account (provide username)")
+    parser.add_argument("--skip-classifier", action="store_true", help="Use keyword classification only and never load the neural model")
     args = parser.parse_args()
     
-    app = AINewsScraperApp()
+    app = AINewsScraperApp(skip_classifier=args.skip_classifier)
     
     try:
         if args.post_tweets:
             await app.process_tweets()
         elif args.export_tweets:
             # Export tweets to JSON file
-            fetcher = TwitterFetcher()
-            tweets = await fetcher.fetch_new_tweets()
+            tweets = await app.twitter_fetcher.fetch_new_tweets()
             if tweets:
-                with open(args.export_tweets, 'w', encoding='utf-8') as f:
-                    json.dump(tweets, f, ensure_ascii=False, indent=2)
-                logger.info(f"Exported {len(tweets)} tweets to {args.export_tweets}")
+                with open(args.export_tweets, 'wb') as f:
+                    f.write(orjson.dumps(tweets, option=orjson.OPT_INDENT_2))
+                logger.info("Exported %s tweets to %s", len(tweets), args.export_tweets)
             else:
                 logger.info("No tweets found to export")
         elif args.test_classifier:
             # Test neural network classifier
-            classifier = ContentClassifier()
+            classifier = app.classifier
             category, confidence = classifier.classify_content(args.test_classifier)
             print(f"\nТекст: {args.test_classifier}")
             print(f"Категория: {category}")
@@ -457,49 +561,21 @@ async def main():
             await app.debug_tweets(username=args.test_media_account)
         elif args.send_test_news:
             # Send 5 sample news articles to Telegram with classification
-            sample_articles = [
-                {
-                    'title': 'OpenAI Launches GPT-5 with Revolutionary Multimodal Capabilities',
-                    'content': 'OpenAI has announced the release of GPT-5, featuring groundbreaking multimodal capabilities that can process text, images, audio, and video simultaneously. The new model represents a significant advancement in artificial intelligence technology.',
-                    'source': 'Sample Tech News',
-                    'url': 'https://example.com/gpt5-launch'
-                },
-                {
-                    'title': 'Google DeepMind Publishes Research on Quantum AI Breakthrough',
-                    'content': 'Researchers at Google DeepMind have published a groundbreaking study demonstrating how quantum computing can accelerate machine learning algorithms. The research shows promising results for solving complex optimization problems.',
-                    'source': 'Sample AI Research',
-                    'url': 'https://example.com/deepmind-quantum'
-                },
-                {
-                    'title': 'Meta CEO Mark Zuckerberg Announces $50 Billion AI Investment',
-                    'content': 'Meta CEO Mark Zuckerberg revealed plans to invest $50 billion in artificial intelligence research and development over the next five years. The investment will focus on developing next-generation AI models and infrastructure.',
-                    'source': 'Sample Business News',
-                    'url': 'https://example.com/meta-investment'
-                },
-                {
-                    'title': 'Microsoft Releases Major Update to Azure AI Services',
-                    'content': 'Microsoft has rolled out a comprehensive update to its Azure AI services, introducing new machine learning tools and enhanced natural language processing capabilities. The update includes improved integration with existing Microsoft products.',
-                    'source': 'Sample Tech Updates',
-                    'url': 'https://example.com/azure-update'
-                },
-                {
-                    'title': 'Stanford Researchers Develop New AI Model for Drug Discovery',
-                    'content': 'A team of researchers at Stanford University has developed an innovative AI model that can predict drug interactions and accelerate the drug discovery process. The model has shown promising results in preliminary tests.',
-                    'source': 'Sample Research News',
-                    'url': 'https://example.com/stanford-drug-ai'
-                }
-            ]
+            # Copies, since classification is added to each article
+            sample_articles = [dict(article) for article in SAMPLE_ARTICLES]
             
             # Add classification to each article
-            classifier = ContentClassifier()
-            for article in sample_articles:
-                text_to_classify = f"{article['title']} {article['content'][:200]}"
-                category, confidence = classifier.classify_content(text_to_classify)
+            classifier = app.classifier
+            classifications = classifier.classify_batch(
+                [article['title'] for article in sample_articles],
+                [article['content'] for article in sample_articles]
+            )
+            for article, (category, _) in zip(sample_articles, classifications):
                 article['classification'] = category
             
             # Send articles to Telegram
-            sent_count = await app.publisher.send_articles_batch(sample_articles)
-            logger.info(f"✅ Sent {sent_count}/5 sample news articles to Telegram.")
+            sent_count = await app.publisher.send_articles_batch(sample_articles, app.publish_limiter)
+            logger.info("✅ Sent %s/5 sample news articles to Telegram.", sent_count)
         elif args.once:
             await app.run_once()
         else:
@@ -507,9 +583,11 @@ async def main():
     except KeyboardInterrupt:
         logger.info("🛑 Scraper stopped by user")
     except Exception as e:
-        logger.error(f"💥 Unexpected error: {e}")
+        logger.error("💥 Unexpected error: %s", e)
     finally:
         await app.publisher.close()
+        await app.http_client.aclose()
+        await app.scraper.close()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
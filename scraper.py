@@ -3,40 +3,400 @@ AI News Scraper Module
 Handles web scraping of AI news articles from multiple sources
 """
 
-import requests
-import time
+import asyncio
 import logging
-from typing import List, Dict, Optional, Tuple
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+import os
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+from cssselect import HTMLTranslator
+from lxml import etree, html as lxml_html
+from selectolax.lexbor import LexborHTMLParser
 from datetime import datetime, timedelta
+from pathlib import Path
 import re
+from functools import lru_cache
+import ahocorasick
+import ciso8601
+from dateutil import parser as dateutil_parser
 from config import (
     REQUEST_DELAY, REQUEST_TIMEOUT, MAX_RETRIES, 
-    USER_AGENT, NEWS_SOURCES, X_BEARER_TOKEN, X_API_ENDPOINT, X_USER_ID,
-    MAX_ARTICLE_AGE_DAYS
+    USER_AGENT, get_news_sources, X_BEARER_TOKEN, X_API_ENDPOINT, X_USER_ID,
+    MAX_ARTICLE_AGE_DAYS, HOST_CONCURRENCY, HTTP_CACHE_DIR, HTTP_CACHE_TTL, MAX_PAGE_BYTES
 )
 import httpx
-from tenacity import retry, stop_after_attempt, wait_fixed
+import hishel
+from tenacity import (
+    retry, stop_after_attempt, wait_fixed, wait_incrementing,
+    retry_if_exception, before_sleep_log
+)
 from database import NewsDatabase
-from classifier import ContentClassifier
+
+if TYPE_CHECKING:
+    from classifier import ContentClassifier
 
 logger = logging.getLogger(__name__)
 
+# Responses worth retrying; other client errors (404 etc.) fail immediately
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Common date formats to try
+DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%dT%H:%M:%S.%fZ',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%d %B %Y',
+    '%d %b %Y',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%Y/%m/%d',
+    '%d-%m-%Y',
+    '%m-%d-%Y',
+)
+
+# Common URL date patterns
+URL_DATE_PATTERNS = tuple(re.compile(p) for p in (
+    r'/(\d{4})/(\d{2})/(\d{2})/',  # /2023/06/08/
+    r'/(\d{4})-(\d{2})-(\d{2})/',  # /2023-06-08/
+    r'/(\d{4})(\d{2})(\d{2})/',    # /20230608/
+    r'-(\d{4})-(\d{2})-(\d{2})',   # -2023-06-08
+    r'(\d{4})-(\d{2})-(\d{2})',    # 2023-06-08
+))
+
+# Dates found in article text further ahead than this are treated as misparses
+MAX_FUTURE_DATE = timedelta(days=30)
+
+# Date patterns in article text
+TEXT_DATE_PATTERNS = tuple(re.compile(p) for p in (
+    r'\b(\w+ \d{1,2}, \d{4})\b',  # Jun 08, 2023
+    r'\b(\d{1,2} \w+ \d{4})\b',   # 08 Jun 2023
+    r'\b(\d{4}-\d{2}-\d{2})\b',   # 2023-06-08
+))
+
+# ISO-8601 strings carrying a full calendar date; ciso8601 also accepts bare "2023" or "2023-06"
+_ISO_FULL_DATE = re.compile(r'\d{4}-\d{2}-\d{2}|\d{8}')
+
+# Two parses with different defaults agree only if year, month and day all came from the text
+_DATEUTIL_DEFAULTS = (datetime(1900, 1, 1), datetime(1901, 2, 2))
+
+def _to_naive_local(parsed: datetime) -> datetime:
+    """Convert an aware datetime to local time and drop tzinfo; naive ones pass through"""
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone()
+    return parsed.replace(tzinfo=None)
+
+@lru_cache(maxsize=1024)
+def parse_date_text(date_text: str, fuzzy: bool = True) -> Optional[datetime]:
+    """Parse a stripped date string into a naive local datetime, or None; fuzzy skips surrounding words"""
+    # Fast path for ISO-8601, the usual format of datetime attributes
+    if _ISO_FULL_DATE.match(date_text):
+        try:
+            return _to_naive_local(ciso8601.parse_datetime(date_text))
+        except ValueError:
+            pass
+    
+    # Natural-language dates, rejected when any of year, month or day was filled in by default
+    try:
+        first, second = (
+            dateutil_parser.parse(date_text, fuzzy=fuzzy, default=default)
+            for default in _DATEUTIL_DEFAULTS
+        )
+        if first == second:
+            return _to_naive_local(first)
+    except (ValueError, OverflowError):
+        pass
+    
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_text, fmt)
+        except ValueError:
+            continue
+    
+    return None
+
+# Path markers an article URL must contain, per source: any alternative matches
+# when all of its markers are present
+URL_PATH_RULES: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "venturebeat": (("/ai/",), ("/category/ai/",), ("/programming-development/",)),
+    "scmp": (("/tech/", "/article/"),),
+    "artificialintelligence_news": (("/news/",),),
+    "theverge_ai": (("/ai-artificial-intelligence/",), ("/artificial-intelligence/",)),
+    "epoch_ai_data": (("/data-insights/",),),
+    "epoch_ai_blog": (("/blog/",),),
+    "epoch_ai_gradient": (("/gradient-updates/",),),
+    "metr_research": (("/research/",),),
+    "techxplore": (("/news/",),),
+    "forbes_innovation": (("/innovation/",),),
+    "forbes_ai": (("/ai/",),),
+    "sakana_ai": (("/blog/",),),
+    "interesting_engineering": (("/innovation/",),),
+}
+
+# Every path marker of every source, matched against a URL in one linear scan
+_URL_MARKER_AUTOMATON = ahocorasick.Automaton()
+for _alternatives in URL_PATH_RULES.values():
+    for _markers in _alternatives:
+        for _marker in _markers:
+            _URL_MARKER_AUTOMATON.add_word(_marker, _marker)
+_URL_MARKER_AUTOMATON.make_automaton()
+
+def _url_markers(url: str) -> Set[str]:
+    """Return all known path markers found in a URL"""
+    return {marker for _, marker in _URL_MARKER_AUTOMATON.iter(url)}
+
+def _build_url_validator(alternatives: Tuple[Tuple[str, ...], ...]) -> Callable[[str], bool]:
+    """Build a validator accepting URLs that contain all markers of any alternative"""
+    marker_sets = tuple(frozenset(markers) for markers in alternatives)
+    
+    def validate(url: str) -> bool:
+        found = _url_markers(url)
+        return any(markers <= found for markers in marker_sets)
+    
+    return validate
+
+URL_VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    key: _build_url_validator(alternatives) for key, alternatives in URL_PATH_RULES.items()
+}
+
+def _accept_any_url(url: str) -> bool:
+    """Default validator for sources without URL rules"""
+    return True
+
+# Query parameters that only track the referrer and never change the page
+TRACKING_PARAMS = frozenset({'ref', 'fbclid', 'gclid', 'mc_cid', 'mc_eid'})
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so tracking parameters, fragments and trailing slashes don't create duplicates"""
+    parts = urlsplit(url)
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ])
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+class PageTooLargeError(httpx.HTTPError):
+    """Response body is larger than MAX_PAGE_BYTES"""
+
+class _BudgetedStream(httpx.AsyncByteStream):
+    """Decoded response body stream that raises PageTooLargeError past max_bytes"""
+    
+    def __init__(self, response: httpx.Response, url: str, max_bytes: int):
+        self._response = response
+        self._url = url
+        self._max_bytes = max_bytes
+    
+    async def __aiter__(self):
+        received = 0
+        # aiter_bytes undoes Content-Encoding, so a small gzip/br body can't expand past the budget
+        async for chunk in self._response.aiter_bytes():
+            received += len(chunk)
+            if received > self._max_bytes:
+                # Raising keeps the cache from storing a cut-off page as a complete response
+                raise PageTooLargeError(f"Body of {self._url} exceeds {self._max_bytes} bytes")
+            yield chunk
+    
+    async def aclose(self):
+        await self._response.aclose()
+
+class SizeLimitedTransport(httpx.AsyncBaseTransport):
+    """Network transport enforcing MAX_PAGE_BYTES below the HTTP cache.
+    
+    The cache reads whole bodies before handing responses back, so the limit has to
+    apply here to bound memory, download size and the on-disk cache entry.
+    """
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_bytes: int = MAX_PAGE_BYTES):
+        self._transport = transport
+        self._max_bytes = max_bytes
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        
+        # Reject pages declaring an oversized body before downloading them
+        content_length = response.headers.get('content-length', '')
+        if content_length.isdigit() and int(content_length) > self._max_bytes:
+            await response.aclose()
+            raise PageTooLargeError(
+                f"Content-Length {content_length} of {request.url} exceeds {self._max_bytes} bytes"
+            )
+        
+        # The body is passed on decoded, so its encoding and wire length no longer apply
+        headers = response.headers.copy()
+        headers.pop('content-encoding', None)
+        headers.pop('content-length', None)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            stream=_BudgetedStream(response, str(request.url), self._max_bytes),
+            extensions=response.extensions,
+            request=request
+        )
+    
+    async def aclose(self):
+        await self._transport.aclose()
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry transport failures and throttling/server errors"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+# Parse HTML with lxml at most once per page, only needed for fallback selectors
+_lxml_document = lru_cache(maxsize=1)(lxml_html.fromstring)
+
+@lru_cache(maxsize=None)
+def _fallback_xpath(selector: str) -> Optional[etree.XPath]:
+    """Compiled XPath for a selector Lexbor can't parse, or None when Lexbor handles it"""
+    try:
+        LexborHTMLParser("").css(selector)
+        return None
+    except Exception:
+        pass
+    try:
+        return etree.XPath(HTMLTranslator().css_to_xpath(selector))
+    except Exception as e:
+        logger.error(f"Unsupported CSS selector '{selector}': {e}")
+        # Matches nothing
+        return etree.XPath("/..")
+
+def _selector_query(selector: str) -> Callable[[LexborHTMLParser, str], list]:
+    """Bind a selector to selectolax or to its precompiled XPath fallback once"""
+    xpath = _fallback_xpath(selector)
+    if xpath is None:
+        return lambda tree, html_content: tree.css(selector)
+    return lambda tree, html_content: xpath(_lxml_document(html_content))
+
+ArticleParser = Callable[[str, Optional[str]], Tuple[Optional[str], Optional[str], Optional[datetime]]]
+
+def build_article_parser(title_selector: str, content_selector: str, date_selector: str) -> ArticleParser:
+    """Build a parser with a source's selectors resolved up front"""
+    select_title = _selector_query(title_selector)
+    select_content = _selector_query(content_selector)
+    select_date = _selector_query(date_selector)
+    node_text = NewsScraper._node_text
+    node_attr = NewsScraper._node_attr
+    
+    def parse(html_content: str, url: Optional[str] = None) -> Tuple[Optional[str], Optional[str], Optional[datetime]]:
+        tree = LexborHTMLParser(html_content)
+        
+        # Extract title
+        title = None
+        title_elements = select_title(tree, html_content)
+        if title_elements:
+            title = node_text(title_elements[0])
+        
+        # Extract content, filtering out short text (likely ads)
+        paragraphs = [text for text in map(node_text, select_content(tree, html_content)) if len(text) > 50]
+        content = '\n\n'.join(paragraphs) if paragraphs else None
+        
+        # Extract date - try multiple methods
+        article_date = None
+        
+        # Method 1: Try standard date selectors, preferring machine-readable attributes
+        date_elements = select_date(tree, html_content)
+        if date_elements:
+            date_element = date_elements[0]
+            date_text = (
+                node_attr(date_element, 'datetime')
+                or node_attr(date_element, 'content')
+                or node_text(date_element)
+            )
+            article_date = NewsScraper._parse_date(date_text)
+        
+        # Method 2: If no date found, try to extract from URL
+        if not article_date and url:
+            article_date = NewsScraper._extract_date_from_url(url)
+        
+        # Method 3: If still no date, try to extract from article text
+        if not article_date and content:
+            article_date = NewsScraper._extract_date_from_text(content)
+        
+        # Method 4: If still no date, try to extract from title
+        if not article_date and title:
+            article_date = NewsScraper._extract_date_from_text(title)
+        
+        return title, content, article_date
+    
+    return parse
+
+@lru_cache(maxsize=None)
+def _source_article_parser(source_key: str) -> ArticleParser:
+    """Article parser for a configured source, built once per process"""
+    config = get_news_sources()[source_key]
+    return build_article_parser(config['title_selector'], config['content_selector'], config['date_selector'])
+
+def _parse_article_static(source_key: str, html_content: str, url: str) -> Tuple[Optional[str], Optional[str], Optional[datetime]]:
+    """Picklable process-pool entry point parsing an article with its source selectors"""
+    return _source_article_parser(source_key)(html_content, url)
+
 class NewsScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, database: Optional[NewsDatabase] = None):
+        # Used to skip already published articles before fetching them
+        self.database = database
+        self.headers = {
             'User-Agent': USER_AGENT,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
-        })
+        }
         self.max_age = timedelta(days=MAX_ARTICLE_AGE_DAYS)
+        # Per-source settings resolved once instead of on every article
+        self._sources: Dict[str, SimpleNamespace] = {
+            key: SimpleNamespace(
+                name=config['name'],
+                url=config['url'],
+                base_url=config['base_url'],
+                select_links=_selector_query(config['article_links_selector']),
+                url_validator=URL_VALIDATORS.get(key, _accept_any_url)
+            )
+            for key, config in get_news_sources().items()
+        }
+        # Build article parsers once, at load time, so selectors Lexbor can't parse are translated up front
+        for key in self._sources:
+            _source_article_parser(key)
+        # Per-host limits on concurrent fetches, reset for every scrape_all_sources run
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Canonical URLs already queued in the current run, shared across sources
+        self._seen_urls: Set[str] = set()
+        # One pooled HTTP/2 client reused for every source and article. Responses are
+        # cached on disk and revalidated with ETag/Last-Modified per Cache-Control;
+        # heuristic freshness only ever serves article pages, index pages always revalidate
+        # The page size budget sits between the cache and the network
+        network = SizeLimitedTransport(httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        ))
+        self.client = httpx.AsyncClient(
+            transport=hishel.AsyncCacheTransport(
+                transport=network,
+                storage=hishel.AsyncFileStorage(base_path=Path(HTTP_CACHE_DIR), ttl=HTTP_CACHE_TTL),
+                controller=hishel.Controller(
+                    cacheable_methods=["GET"],
+                    cacheable_status_codes=[200, 301, 308],
+                    allow_heuristics=True
+                )
+            ),
+            headers=self.headers,
+            timeout=REQUEST_TIMEOUT,
+            follow_redirects=True
+        )
+    
+        # Worker processes parse article HTML in parallel, outside the GIL and the event loop
+        self._parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
     
-    def _parse_date(self, date_text: str) -> Optional[datetime]:
+    async def close(self):
+        """Close the pooled HTTP client and the parser processes"""
+        await self.client.aclose()
+        self._parse_pool.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def _parse_date(date_text: str, fuzzy: bool = True) -> Optional[datetime]:
         """Parse date from various formats"""
         if not date_text:
             return None
@@ -44,156 +404,138 @@ class NewsScraper:
         # Clean up the date text
         date_text = date_text.strip()
         
-        # Common date formats to try
-        date_formats = [
-            '%Y-%m-%d',
-            '%Y-%m-%dT%H:%M:%S',
-            '%Y-%m-%dT%H:%M:%SZ',
-            '%Y-%m-%dT%H:%M:%S.%fZ',
-            '%B %d, %Y',
-            '%b %d, %Y',
-            '%d %B %Y',
-            '%d %b %Y',
-            '%m/%d/%Y',
-            '%d/%m/%Y',
-            '%Y/%m/%d',
-            '%d-%m-%Y',
-            '%m-%d-%Y',
-        ]
-        
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(date_text, fmt)
-            except ValueError:
-                continue
-        
-        # Try to extract date with regex patterns
-        patterns = [
-            r'(\d{4}-\d{2}-\d{2})',
-            r'(\d{1,2}/\d{1,2}/\d{4})',
-            r'(\w+ \d{1,2}, \d{4})',
-            r'(\d{1,2} \w+ \d{4})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, date_text)
-            if match:
-                try:
-                    date_str = match.group(1)
-                    for fmt in date_formats:
-                        try:
-                            return datetime.strptime(date_str, fmt)
-                        except ValueError:
-                            continue
-                except:
-                    continue
-        
-        logger.warning(f"Could not parse date: {date_text}")
-        return None
+        parsed = parse_date_text(date_text, fuzzy)
+        if parsed is None:
+            logger.warning("Could not parse date: %s", date_text)
+        return parsed
 
-    def _extract_date_from_url(self, url: str) -> Optional[datetime]:
+    @staticmethod
+    def _extract_date_from_url(url: str) -> Optional[datetime]:
         """Try to extract date from URL"""
-        # Common URL date patterns
-        url_patterns = [
-            r'/(\d{4})/(\d{2})/(\d{2})/',  # /2023/06/08/
-            r'/(\d{4})-(\d{2})-(\d{2})/',  # /2023-06-08/
-            r'/(\d{4})(\d{2})(\d{2})/',    # /20230608/
-            r'-(\d{4})-(\d{2})-(\d{2})',   # -2023-06-08
-            r'(\d{4})-(\d{2})-(\d{2})',    # 2023-06-08
-        ]
-        
-        for pattern in url_patterns:
-            match = re.search(pattern, url)
+        for pattern in URL_DATE_PATTERNS:
+            match = pattern.search(url)
             if match:
                 try:
-                    if len(match.groups()) == 3:
-                        year, month, day = match.groups()
-                        return datetime(int(year), int(month), int(day))
-                except (ValueError, IndexError):
+                    year, month, day = match.groups()
+                    return datetime(int(year), int(month), int(day))
+                except ValueError:
                     continue
         
         return None
 
-    def _extract_date_from_text(self, text: str) -> Optional[datetime]:
+    @staticmethod
+    def _extract_date_from_text(text: str) -> Optional[datetime]:
         """Try to extract date from article text"""
-        # Look for date patterns in text
-        text_patterns = [
-            r'\b(\w+ \d{1,2}, \d{4})\b',  # Jun 08, 2023
-            r'\b(\d{1,2} \w+ \d{4})\b',   # 08 Jun 2023
-            r'\b(\d{4}-\d{2}-\d{2})\b',   # 2023-06-08
-        ]
-        
-        for pattern in text_patterns:
-            matches = re.findall(pattern, text)
+        latest_allowed = None
+        for pattern in TEXT_DATE_PATTERNS:
+            matches = pattern.findall(text)
             if matches:
                 # Try to parse the first match
                 for match in matches:
-                    parsed_date = self._parse_date(match)
+                    # Regex matches are already just the date; fuzzy parsing would accept junk
+                    parsed_date = NewsScraper._parse_date(match, fuzzy=False)
                     if parsed_date:
                         # Only return dates that seem reasonable (not too far in the future)
-                        if parsed_date <= datetime.now() + timedelta(days=30):
+                        if latest_allowed is None:
+                            latest_allowed = datetime.now() + MAX_FUTURE_DATE
+                        if parsed_date <= latest_allowed:
                             return parsed_date
         
         return None
     
-    def _is_article_recent(self, article_date: Optional[datetime]) -> bool:
-        """Check if article is within the maximum age limit"""
+    def _is_article_recent(self, article_date: Optional[datetime], now: datetime) -> bool:
+        """Check if article is within the maximum age limit as of now"""
         if not article_date:
             # If we can't determine the date, be more conservative
             logger.warning("No article date found, assuming article is NOT recent to avoid old articles")
             return False
         
-        age = datetime.now() - article_date
+        age = now - article_date
         is_recent = age <= self.max_age
         
         if not is_recent:
-            logger.info(f"Article is too old: {age.days} days (max: {MAX_ARTICLE_AGE_DAYS} days)")
+            logger.info("Article is too old: %d days (max: %d days)", age.days, MAX_ARTICLE_AGE_DAYS)
         else:
-            logger.info(f"Article is recent: {age.days} days old")
+            logger.info("Article is recent: %d days old", age.days)
         
         return is_recent
     
-    def get_page_content(self, url: str) -> Optional[str]:
-        """Fetch page content with retry logic"""
-        for attempt in range(MAX_RETRIES):
-            try:
-                logger.info(f"Fetching page: {url} (attempt {attempt + 1})")
-                response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-                response.raise_for_status()
-                return response.text
-            except requests.RequestException as e:
-                logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(REQUEST_DELAY * (attempt + 1))
-                else:
-                    logger.error(f"Failed to fetch {url} after {MAX_RETRIES} attempts")
-                    return None
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Semaphore limiting concurrent fetches to the host of the URL"""
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(HOST_CONCURRENCY)
+        return semaphore
+    
+    @retry(
+        stop=stop_after_attempt(MAX_RETRIES),
+        wait=wait_incrementing(start=REQUEST_DELAY, increment=REQUEST_DELAY),
+        retry=retry_if_exception(_is_retryable),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True
+    )
+    async def _fetch(self, url: str, revalidate: bool = False) -> Optional[str]:
+        """GET a page over the pooled client; SizeLimitedTransport caps the body at MAX_PAGE_BYTES"""
+        # no-cache makes the cache check with the server even when a stored copy looks fresh
+        headers = {'Cache-Control': 'no-cache'} if revalidate else None
+        try:
+            response = await self.client.get(url, headers=headers)
+        except PageTooLargeError as e:
+            logger.warning("Skipping %s: %s", url, e)
+            return None
+        response.raise_for_status()
+        return response.content.decode(response.charset_encoding or 'utf-8', errors='replace')
+    
+    async def get_page_content(self, url: str, revalidate: bool = False) -> Optional[str]:
+        """Fetch page content with retry logic; revalidate=True bypasses cached freshness"""
+        try:
+            logger.info("Fetching page: %s", url)
+            return await self._fetch(url, revalidate)
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to fetch {url}: {e}")
+            return None
+    
+    @staticmethod
+    def _node_text(node) -> str:
+        """Stripped text of a selectolax node or an lxml element"""
+        if isinstance(node, etree._Element):
+            return ''.join(text.strip() for text in node.itertext())
+        return node.text(strip=True)
+    
+    @staticmethod
+    def _node_attr(node, name: str) -> Optional[str]:
+        """Attribute value of a selectolax node or an lxml element"""
+        attributes = node.attrib if isinstance(node, etree._Element) else node.attributes
+        return attributes.get(name)
     
     def extract_article_links(self, source_key: str, html_content: str) -> List[str]:
-        """Extract article links from a source page"""
-        source_config = NEWS_SOURCES[source_key]
-        soup = BeautifulSoup(html_content, 'lxml')
-        links = []
+        """Extract article links as linked, one per canonical URL"""
+        source = self._sources[source_key]
+        tree = LexborHTMLParser(html_content)
+        # Canonical URL (dedup key only) -> URL as linked; dict keeps page order so the
+        # freshest links come first
+        links: Dict[str, str] = {}
         
         try:
             # Find all article links
-            article_elements = soup.select(source_config['article_links_selector'])
+            article_elements = source.select_links(tree, html_content)
             
             for element in article_elements:
-                href = element.get('href')
+                href = self._node_attr(element, 'href')
                 if href:
                     # Convert relative URLs to absolute URLs
-                    full_url = urljoin(source_config['base_url'], href)
+                    full_url = urljoin(source.base_url, href)
                     
                     # Filter out non-article URLs
                     if self._is_valid_article_url(full_url, source_key):
-                        links.append(full_url)
+                        links.setdefault(canonicalize_url(full_url), full_url)
             
-            logger.info(f"Found {len(links)} article links from {source_config['name']}")
-            return list(set(links))  # Remove duplicates
+            logger.info("Found %d article links from %s", len(links), source.name)
+            return list(links.values())
             
         except Exception as e:
-            logger.error(f"Error extracting links from {source_config['name']}: {e}")
+            logger.error(f"Error extracting links from {source.name}: {e}")
             return []
     
     def _is_valid_article_url(self, url: str, source_key: str) -> bool:
@@ -205,166 +547,165 @@ class NewsScraper:
             return False
         
         # Source-specific validation
-        if source_key == "venturebeat":
-            return "/ai/" in url or "/category/ai/" in url or "/programming-development/" in url
-        elif source_key == "scmp":
-            return "/tech/" in url and "/article/" in url
-        elif source_key == "artificialintelligence_news":
-            return "/news/" in url
-        elif source_key == "theverge_ai":
-            return "/ai-artificial-intelligence/" in url or "/artificial-intelligence/" in url
-        elif source_key == "epoch_ai_data":
-            return "/data-insights/" in url
-        elif source_key == "epoch_ai_blog":
-            return "/blog/" in url
-        elif source_key == "epoch_ai_gradient":
-            return "/gradient-updates/" in url
-        elif source_key == "metr_research":
-            return "/research/" in url
-        elif source_key == "techxplore":
-            return "/news/" in url
-        elif source_key == "forbes_innovation":
-            return "/innovation/" in url
-        elif source_key == "forbes_ai":
-            return "/ai/" in url
-        elif source_key == "sakana_ai":
-            return "/blog/" in url
-        elif source_key == "interesting_engineering":
-            return "/innovation/" in url
-        
-        return True
+        return self._sources[source_key].url_validator(url)
     
     def extract_article_content(self, source_key: str, html_content: str, url: str = None) -> Tuple[Optional[str], Optional[str], Optional[datetime]]:
         """Extract title, content, and date from an article page"""
-        source_config = NEWS_SOURCES[source_key]
-        soup = BeautifulSoup(html_content, 'lxml')
+        return _source_article_parser(source_key)(html_content, url)
+    
+    async def _scrape_article(self, source_key: str, link: str, now: datetime) -> Optional[Dict]:
+        """Fetch and parse a single article, returning None if it should be skipped"""
+        source = self._sources[source_key]
         
-        # Extract title
-        title = None
-        title_element = soup.select_one(source_config['title_selector'])
-        if title_element:
-            title = title_element.get_text(strip=True)
-        
-        # Extract content
-        content = None
-        content_elements = soup.select(source_config['content_selector'])
-        if content_elements:
-            # Combine all paragraphs
-            paragraphs = []
-            for element in content_elements:
-                text = element.get_text(strip=True)
-                if text and len(text) > 50:  # Filter out short text (likely ads)
-                    paragraphs.append(text)
+        async with self._host_semaphore(link):
+            logger.info("Processing article: %s", link)
             
-            if paragraphs:
-                content = '\n\n'.join(paragraphs)
-        
-        # Extract date - try multiple methods
-        article_date = None
+            # Get article page content
+            article_html = await self.get_page_content(link)
+            
+            # Respect rate limits of the host
+            await asyncio.sleep(REQUEST_DELAY)
         
-        # Method 1: Try standard date selectors
-        date_element = soup.select_one(source_config['date_selector'])
-        if date_element:
-            # Try to get date from datetime attribute first
-            date_text = date_element.get('datetime') or date_element.get('content') or date_element.get_text(strip=True)
-            article_date = self._parse_date(date_text)
+        if not article_html:
+            return None
         
-        # Method 2: If no date found, try to extract from URL
-        if not article_date and url:
-            article_date = self._extract_date_from_url(url)
+        # Parse in a worker process so other fetches keep running
+        try:
+            title, content, article_date = await asyncio.get_running_loop().run_in_executor(
+                self._parse_pool, _parse_article_static, source_key, article_html, link
+            )
+        except Exception as e:
+            logger.warning("Parser process failed for %s, parsing in a thread: %s", link, e)
+            title, content, article_date = await asyncio.to_thread(
+                self.extract_article_content, source_key, article_html, link
+            )
         
-        # Method 3: If still no date, try to extract from article text
-        if not article_date and content:
-            article_date = self._extract_date_from_text(content)
+        if not (title and content):
+            return None
         
-        # Method 4: If still no date, try to extract from title
-        if not article_date and title:
-            article_date = self._extract_date_from_text(title)
+        # Check if article is recent enough
+        if not self._is_article_recent(article_date, now):
+            logger.info("Skipping old article: %s (date: %s)", title, article_date)
+            return None
         
-        return title, content, article_date
+        logger.info("Successfully extracted article: %s", title)
+        return {
+            'url': link,
+            'title': title,
+            'content': content,
+            'source': source.name,
+            'source_key': source_key,
+            'date': article_date
+        }
     
-    def scrape_source(self, source_key: str, limit: int = 10) -> List[Dict]:
+    async def scrape_source(self, source_key: str, limit: int = 10) -> List[Dict]:
         """Scrape articles from a specific source"""
-        source_config = NEWS_SOURCES[source_key]
-        articles = []
+        source = self._sources[source_key]
+        # Reference time for this source's recency checks; local so concurrent sources don't share it
+        now = datetime.now()
         
-        logger.info(f"Starting to scrape {source_config['name']}")
+        logger.info(f"Starting to scrape {source.name}")
         
         # Get main page content
-        html_content = self.get_page_content(source_config['url'])
+        async with self._host_semaphore(source.url):
+            # Index pages change every cycle, so never serve them from cache unvalidated
+            html_content = await self.get_page_content(source.url, revalidate=True)
         if not html_content:
-            logger.error(f"Failed to get content from {source_config['name']}")
-            return articles
+            logger.error(f"Failed to get content from {source.name}")
+            return []
         
         # Extract article links
-        article_links = self.extract_article_links(source_key, html_content)
-        
-        # Process each article
-        for link in article_links[:limit]:  # Limit articles per source
-            logger.info(f"Processing article: {link}")
-            
-            # Get article page content
-            article_html = self.get_page_content(link)
-            if not article_html:
+        article_links = await asyncio.to_thread(self.extract_article_links, source_key, html_content)
+        
+        # Skip duplicates within this run and already processed articles before any fetch.
+        # Links are fetched as the site linked them; processed rows are keyed by canonical URL
+        candidates = []
+        for link in article_links:
+            canonical = canonicalize_url(link)
+            if canonical in self._seen_urls:
                 continue
+            self._seen_urls.add(canonical)
             
-            # Extract article content
-            title, content, article_date = self.extract_article_content(source_key, article_html, link)
-            
-            if title and content:
-                # Check if article is recent enough
-                if not self._is_article_recent(article_date):
-                    logger.info(f"Skipping old article: {title} (date: {article_date})")
-                    continue
-                
-                articles.append({
-                    'url': link,
-                    'title': title,
-                    'content': content,
-                    'source': source_config['name'],
-                    'source_key': source_key,
-                    'date': article_date
-                })
-                logger.info(f"Successfully extracted article: {title}")
-            
-            # Respect rate limits
-            time.sleep(REQUEST_DELAY)
-        
-        logger.info(f"Completed scraping {source_config['name']}: {len(articles)} articles found")
+            # Drop articles already known to be too old without fetching them
+            url_date = self._extract_date_from_url(link)
+            if url_date and not self._is_article_recent(url_date, now):
+                logger.info("Skipping old article before fetch: %s (date: %s)", link, url_date)
+                continue
+            candidates.append((link, canonical))
+        if self.database and candidates:
+            # The raw link only matches legacy rows stored before URLs were canonicalized
+            unprocessed = self.database.filter_unprocessed(
+                [link for link, _ in candidates] + [canonical for _, canonical in candidates]
+            )
+            candidates = [
+                (link, canonical) for link, canonical in candidates
+                if link in unprocessed and canonical in unprocessed
+            ]
+        candidates = [link for link, _ in candidates]
+        
+        # Fetch articles concurrently, limited per host
+        results = await asyncio.gather(
+            *(self._scrape_article(source_key, link, now) for link in candidates[:limit])
+        )
+        articles = [article for article in results if article]
+        
+        logger.info(f"Completed scraping {source.name}: {len(articles)} articles found")
         return articles
     
-    def scrape_all_sources(self, limit_per_source: int = 10) -> List[Dict]:
-        """Scrape articles from all configured sources"""
+    async def scrape_all_sources(self, limit_per_source: int = 10) -> List[Dict]:
+        """Scrape articles from all configured sources concurrently"""
         all_articles = []
-        
-        for source_key in NEWS_SOURCES.keys():
-            try:
-                articles = self.scrape_source(source_key, limit_per_source)
-                all_articles.extend(articles)
-                
-                # Delay between sources
-                time.sleep(REQUEST_DELAY * 2)
-                
-            except Exception as e:
-                logger.error(f"Error scraping {source_key}: {e}")
+        source_keys = list(self._sources)
+        self._host_semaphores = {}
+        self._seen_urls = set()
+        
+        results = await asyncio.gather(
+            *(self.scrape_source(source_key, limit_per_source) for source_key in source_keys),
+            return_exceptions=True
+        )
+        
+        for source_key, result in zip(source_keys, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scraping {source_key}: {result}")
                 continue
+            all_articles.extend(result)
         
         logger.info(f"Total articles scraped: {len(all_articles)}")
         return all_articles
 
+# URL fields to try, in order, for each X API media type
+_MEDIA_FIELDS = {
+    'photo': ('url',),
+    'video': ('url', 'preview_image_url'),
+    'animated_gif': ('url', 'preview_image_url'),
+}
+
 class TwitterFetcher:
-    def __init__(self, user_id: str = X_USER_ID, bearer_token: str = X_BEARER_TOKEN):
+    def __init__(self, user_id: str = X_USER_ID, bearer_token: str = X_BEARER_TOKEN,
+                 classifier: Optional["ContentClassifier"] = None,
+                 database: Optional[NewsDatabase] = None):
         self.user_id = user_id
         self.bearer_token = bearer_token
         self.api_endpoint = X_API_ENDPOINT
-        self.db = NewsDatabase()
-        self.classifier = ContentClassifier()
+        # Share the caller's database so repeated fetchers don't each open a connection
+        self.db = database or NewsDatabase()
+        self._classifier = classifier
+    
+    @property
+    def classifier(self) -> "ContentClassifier":
+        """Content classifier, imported and loaded on first use"""
+        if self._classifier is None:
+            # Deferred: the classifier module pulls in torch and sentence-transformers
+            from classifier import ContentClassifier
+            self._classifier = ContentClassifier()
+        return self._classifier
 
-    def classify_tweet(self, text: str) -> str:
-        """Classify tweet content using neural network"""
-        category, confidence = self.classifier.classify_content(text)
-        logger.info(f"Tweet classified as: {category} (confidence: {confidence:.3f})")
-        return category
+    def classify_tweets(self, texts: List[str]) -> List[str]:
+        """Classify several tweets in one batched forward pass"""
+        results = self.classifier.classify_batch(texts)
+        for category, confidence in results:
+            logger.info("Tweet classified as: %s (confidence: %.3f)", category, confidence)
+        return [category for category, _ in results]
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(5))
     async def fetch_new_tweets(self, max_results: int = 30) -> list:
@@ -410,11 +751,12 @@ class TwitterFetcher:
                 data = resp.json()
                 
                 # Debug: Log the raw response structure
-                logger.info(f"API Response keys: {list(data.keys())}")
-                if "includes" in data:
-                    logger.info(f"Includes keys: {list(data['includes'].keys())}")
-                    if "media" in data["includes"]:
-                        logger.info(f"Found {len(data['includes']['media'])} media items")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("API Response keys: %s", list(data.keys()))
+                    if "includes" in data:
+                        logger.debug("Includes keys: %s", list(data['includes'].keys()))
+                        if "media" in data["includes"]:
+                            logger.debug("Found %d media items", len(data['includes']['media']))
                 
                 tweets = data.get("data", [])
                 if not tweets:
@@ -426,7 +768,7 @@ class TwitterFetcher:
                 # Get referenced tweets for full text extraction
                 referenced_tweets = {t["id"]: t for t in data.get("includes", {}).get("tweets", [])}
                 
-                logger.info(f"Processing {len(tweets)} tweets with {len(media)} media items available")
+                logger.info("Processing %d tweets with %d media items available", len(tweets), len(media))
                 
                 # Transform tweets to required format
                 formatted_tweets = []
@@ -434,43 +776,22 @@ class TwitterFetcher:
                     author = users.get(tweet.get("author_id", ""), {})
                     media_urls = []
                     
-                    # Debug: Log tweet structure
-                    logger.debug(f"Tweet {tweet['id']} has keys: {list(tweet.keys())}")
-                    
-                    # Extract media URLs
-                    if "attachments" in tweet and "media_keys" in tweet["attachments"]:
-                        logger.info(f"Tweet {tweet['id']} has {len(tweet['attachments']['media_keys'])} media attachments")
-                        for media_key in tweet["attachments"]["media_keys"]:
-                            if media_key in media:
-                                media_item = media[media_key]
-                                logger.info(f"Media item {media_key}: type={media_item.get('type')}, keys={list(media_item.keys())}")
-                                
-                                if media_item.get("type") == "photo":
-                                    photo_url = media_item.get("url", "")
-                                    if photo_url:
-                                        media_urls.append(photo_url)
-                                        logger.info(f"Added photo URL: {photo_url}")
-                                elif media_item.get("type") == "video":
-                                    # Try different video URL fields
-                                    video_url = media_item.get("url") or media_item.get("preview_image_url", "")
-                                    if video_url:
-                                        media_urls.append(video_url)
-                                        logger.info(f"Added video URL: {video_url}")
-                                elif media_item.get("type") == "animated_gif":
-                                    gif_url = media_item.get("url") or media_item.get("preview_image_url", "")
-                                    if gif_url:
-                                        media_urls.append(gif_url)
-                                        logger.info(f"Added GIF URL: {gif_url}")
-                            else:
-                                logger.warning(f"Media key {media_key} not found in media includes")
-                    else:
-                        logger.debug(f"Tweet {tweet['id']} has no media attachments")
+                    # Extract media URLs, trying each type's URL fields in order
+                    for media_key in tweet.get("attachments", {}).get("media_keys", ()):
+                        media_item = media.get(media_key)
+                        if media_item is None:
+                            logger.warning("Media key %s not found in media includes", media_key)
+                            continue
+                        fields = _MEDIA_FIELDS.get(media_item.get("type"), ())
+                        media_url = next((media_item[field] for field in fields if media_item.get(field)), None)
+                        if media_url:
+                            media_urls.append(media_url)
                     
                     # Get full text - handle retweets with comments that might be truncated
                     full_text = tweet["text"]
                     
                     # Log text length for debugging
-                    logger.debug(f"Tweet {tweet['id']} text length: {len(full_text)} characters")
+                    logger.debug("Tweet %s text length: %d characters", tweet['id'], len(full_text))
                     
                     # Check if this is a retweet with comments and text might be truncated
                     if "referenced_tweets" in tweet:
@@ -495,11 +816,11 @@ class TwitterFetcher:
                                             # If no RT marker, just use the referenced tweet text
                                             full_text = referenced_tweet.get("text", full_text)
                                         
-                                        logger.debug(f"Retweet with truncated text reconstructed: {len(full_text)} chars")
+                                        logger.debug("Retweet with truncated text reconstructed: %d chars", len(full_text))
                                     else:
-                                        logger.debug(f"Referenced tweet {ref_tweet['id']} not found in includes")
+                                        logger.debug("Referenced tweet %s not found in includes", ref_tweet['id'])
                                 else:
-                                    logger.debug(f"Retweet with comments detected, text not truncated: {len(full_text)} chars")
+                                    logger.debug("Retweet with comments detected, text not truncated: %d chars", len(full_text))
                                 break
                     
                     formatted_tweet = {
@@ -508,11 +829,15 @@ class TwitterFetcher:
                         "author_name": author.get("name", ""),
                         "post_text": full_text,
                         "post_url": f"https://x.com/{author.get('username', '')}/status/{tweet['id']}",
-                        "media_urls": media_urls,
-                        "classification": self.classify_tweet(full_text)
+                        "media_urls": media_urls
                     }
                     formatted_tweets.append(formatted_tweet)
                 
+                # Classify all tweets at once instead of one forward pass per tweet
+                categories = self.classify_tweets([t["post_text"] for t in formatted_tweets])
+                for formatted_tweet, category in zip(formatted_tweets, categories):
+                    formatted_tweet["classification"] = category
+                
                 # Sort from oldest to newest
                 formatted_tweets = sorted(formatted_tweets, key=lambda t: int(t["post_id"]))
                 logger.info(f"Successfully fetched {len(formatted_tweets)} new tweets")
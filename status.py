@@ -5,7 +5,7 @@ Shows current system status and statistics
 
 import asyncio
 from database import NewsDatabase
-from telegram_publisher import TelegramPublisher
+from telegram_publisher import get_publisher
 from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
 
 async def show_status():
@@ -28,7 +28,7 @@ async def show_status():
     
     # Test Telegram connection
     print(f"\n📱 Telegram Status:")
-    publisher = TelegramPublisher()
+    publisher = get_publisher()
     try:
         if await publisher.test_connection():
             print("   ✅ Bot connected successfully")
@@ -3,34 +3,33 @@ import logging
 from aiogram import Bot, Dispatcher
 from aiogram.types import Message
 from aiogram.filters import Command
-import os
+from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# Bot token and chat ID
-BOT_TOKEN = "7542441675:AAHp4-AhVVydGsuSutxwJKVEp6EpJkQ-brk"
-CHAT_ID = -1002717964198  # Updated with -100 prefix for channels
+# Bot token and chat ID, read from the environment (.env) by config
+BOT_TOKEN = TELEGRAM_BOT_TOKEN
+CHAT_ID = TELEGRAM_CHAT_ID
 
-# Initialize bot and dispatcher
-bot = Bot(token=BOT_TOKEN)
-dp = Dispatcher()
-
-@dp.message(Command("start"))
 async def cmd_start(message: Message):
     """Handle /start command"""
     await message.answer("Bot is running! Use /send_hello to send a message to the channel.")
 
-@dp.message(Command("send_hello"))
 async def cmd_send_hello(message: Message):
     """Send hello message to the specified channel"""
     try:
-        await bot.send_message(chat_id=CHAT_ID, text="Hello from the bot! 👋")
+        await message.bot.send_message(chat_id=CHAT_ID, text="Hello from the bot! 👋")
         await message.answer("✅ Hello message sent successfully to the channel!")
     except Exception as e:
         await message.answer(f"❌ Error sending message: {str(e)}")
 
-async def send_test_message():
+def register_handlers(dp: Dispatcher):
+    """Register the bot's command handlers on a dispatcher"""
+    dp.message.register(cmd_start, Command("start"))
+    dp.message.register(cmd_send_hello, Command("send_hello"))
+
+async def send_test_message(bot: Bot):
     """Send a test hello message to the channel"""
     try:
         await bot.send_message(chat_id=CHAT_ID, text="Hello! This is a test message from the bot. 🚀")
@@ -42,23 +41,35 @@ async def send_test_message():
 
 async def main():
     """Main function to run the bot"""
+    if not BOT_TOKEN:
+        print("❌ TELEGRAM_BOT_TOKEN is not set. Add it to your .env file.")
+        return
+
     print("🤖 Starting Telegram Bot...")
-    print(f"📱 Bot Token: {BOT_TOKEN[:20]}...")
+    print(f"📱 Bot Token: {BOT_TOKEN[:10]}...")
     print(f"💬 Target Chat ID: {CHAT_ID}")
-    
-    # Test connection by sending a hello message
-    print("\n📤 Sending test message...")
-    success = await send_test_message()
-    
-    if success:
-        print("✅ Bot is working correctly!")
-        print("🔄 Starting bot polling...")
-        print("💡 You can now send /start or /send_hello to interact with the bot")
-        
-        # Start the bot
-        await dp.start_polling(bot)
-    else:
-        print("❌ Bot failed to send test message. Please check your token and chat ID.")
+
+    # Bot and dispatcher live only while the bot runs, so importing this module opens no session
+    bot = Bot(token=BOT_TOKEN)
+    dp = Dispatcher()
+    register_handlers(dp)
+
+    try:
+        # Test connection by sending a hello message
+        print("\n📤 Sending test message...")
+        success = await send_test_message(bot)
+
+        if success:
+            print("✅ Bot is working correctly!")
+            print("🔄 Starting bot polling...")
+            print("💡 You can now send /start or /send_hello to interact with the bot")
+
+            # Start the bot
+            await dp.start_polling(bot)
+        else:
+            print("❌ Bot failed to send test message. Please check your token and chat ID.")
+    finally:
+        await bot.session.close()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -5,28 +5,98 @@ Handles sending formatted news articles to Telegram channel
 
 import asyncio
 import logging
-from typing import Dict, List
+import re
+import aiohttp
+from functools import lru_cache
+from operator import itemgetter
+from typing import AsyncIterable, Dict, Iterable, Optional, Union
 from aiogram import Bot
-from aiogram.exceptions import TelegramBadRequest
-from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, MESSAGE_TEMPLATE
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiolimiter import AsyncLimiter
+from config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, MESSAGE_TEMPLATE, TELEGRAM_RATE_LIMIT, TELEGRAM_RATE_PERIOD
+)
 
 logger = logging.getLogger(__name__)
 
+# Media file extension (also with X's :large/:orig size suffix) or X's format= query parameter,
+# matched in a single scan
+_MEDIA_RE = re.compile(r'\.(jpe?g|png|gif|mp4|mov|avi)(?=$|[?#&:])|format=(jpe?g|png|mp4)', re.IGNORECASE)
+_MEDIA_KINDS = {
+    'jpg': 'photo', 'jpeg': 'photo', 'png': 'photo', 'gif': 'photo',
+    'mp4': 'video', 'mov': 'video', 'avi': 'video',
+}
+
+# Fields of a new-format tweet, fetched in one C-level call
+_TWEET_FIELDS = itemgetter("post_id", "post_text", "author_username", "author_name", "classification", "post_url")
+
+MEDIA_PROBE_TIMEOUT = 3  # Seconds allowed for the HEAD request classifying a media URL
+
+def _media_kind(media_url: str) -> str:
+    """Classify a media URL as 'photo', 'video' or 'unknown'
+
+    >>> _media_kind('https://pbs.twimg.com/media/abc.jpg:large')
+    'photo'
+    >>> _media_kind('https://pbs.twimg.com/media/abc.png:orig')
+    'photo'
+    >>> _media_kind('https://pbs.twimg.com/media/abc?format=jpg&name=small')
+    'photo'
+    >>> _media_kind('https://video.twimg.com/vid/abc.mp4?tag=12')
+    'video'
+    >>> _media_kind('https://example.com/jpg-guide')
+    'unknown'
+    """
+    match = _MEDIA_RE.search(media_url)
+    if not match:
+        return 'unknown'
+    return _MEDIA_KINDS[(match.group(1) or match.group(2)).lower()]
+
 class TelegramPublisher:
-    def __init__(self):
-        self.bot = Bot(token=TELEGRAM_BOT_TOKEN)
+    # Characters that need to be escaped in Telegram Markdown, mapped to their escaped form
+    _MD_ESCAPE_TABLE = str.maketrans({char: f'\\{char}' for char in '*_[]()~`>#+-=|{}.!'})
+    
+    def __init__(self, session: Optional[AiohttpSession] = None):
+        # The session's aiohttp connection pool keeps the TLS connection to the Bot API alive
+        # Markdown and no link previews are set once as bot-wide defaults for every send call
+        self.bot = Bot(
+            token=TELEGRAM_BOT_TOKEN,
+            session=session or AiohttpSession(),
+            parse_mode='Markdown',
+            disable_web_page_preview=True
+        )
         self.chat_id = TELEGRAM_CHAT_ID
     
     def _escape_markdown(self, text: str) -> str:
         """Escape markdown special characters to prevent parsing errors"""
-        # List of characters that need to be escaped in Telegram Markdown
-        special_chars = ['*', '_', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-        
-        escaped_text = text
-        for char in special_chars:
-            escaped_text = escaped_text.replace(char, f'\\{char}')
-        
-        return escaped_text
+        return text.translate(self._MD_ESCAPE_TABLE)
+    
+    async def _probe_media_kind(self, media_url: str) -> str:
+        """Classify a media URL without an extension from the Content-Type of a HEAD request"""
+        try:
+            # Reuse the bot's aiohttp session and its pooled connections
+            session = await self.bot.session.create_session()
+            async with session.head(
+                media_url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=MEDIA_PROBE_TIMEOUT)
+            ) as response:
+                content_type = response.headers.get('Content-Type', '')
+        except Exception as e:
+            logger.warning(f"Could not probe media type of {media_url}: {e}")
+            return 'unknown'
+        if content_type.startswith('image/'):
+            return 'photo'
+        if content_type.startswith('video/'):
+            return 'video'
+        return 'unknown'
+    
+    async def _send_with_flood_wait(self, method, **kwargs):
+        """Call a bot send method, waiting out Telegram flood control once if asked to"""
+        try:
+            return await method(**kwargs)
+        except TelegramRetryAfter as e:
+            logger.warning(f"Flood control hit, retrying in {e.retry_after} seconds")
+            await asyncio.sleep(e.retry_after)
+            return await method(**kwargs)
     
     async def format_message(self, article: Dict) -> str:
         """Format article data into a Telegram message"""
@@ -67,11 +137,10 @@ class TelegramPublisher:
                 message = f"{classification}\n\n{message}"
             
             # Send the message
-            await self.bot.send_message(
+            await self._send_with_flood_wait(
+                self.bot.send_message,
                 chat_id=self.chat_id,
-                text=message,
-                parse_mode='Markdown',
-                disable_web_page_preview=True
+                text=message
             )
             
             logger.info(f"Successfully sent article: {article['title']}")
@@ -84,24 +153,32 @@ class TelegramPublisher:
             logger.error(f"Error sending article: {e}")
             return False
     
-    async def send_articles_batch(self, articles: List[Dict]) -> int:
-        """Send multiple articles to Telegram channel"""
+    async def send_articles_batch(self, articles: Union[Iterable[Dict], AsyncIterable[Dict]],
+                                  limiter: Optional[AsyncLimiter] = None) -> int:
+        """Send articles to Telegram channel in order, each as soon as it is available"""
+        # Every message goes to one chat, so sends are paced by the per-chat limit rather than fanned out
+        limiter = limiter or AsyncLimiter(TELEGRAM_RATE_LIMIT, TELEGRAM_RATE_PERIOD)
         success_count = 0
+        total = 0
+        
+        async def iterate():
+            if hasattr(articles, '__aiter__'):
+                async for article in articles:
+                    yield article
+            else:
+                for article in articles:
+                    yield article
         
-        for article in articles:
+        async for article in iterate():
+            total += 1
             try:
-                success = await self.send_article(article)
-                if success:
-                    success_count += 1
-                
-                # Add delay between messages to avoid rate limiting
-                await asyncio.sleep(1)
-                
+                async with limiter:
+                    if await self.send_article(article):
+                        success_count += 1
             except Exception as e:
                 logger.error(f"Error processing article {article.get('title', 'Unknown')}: {e}")
-                continue
         
-        logger.info(f"Sent {success_count}/{len(articles)} articles successfully")
+        logger.info(f"Sent {success_count}/{total} articles successfully")
         return success_count
     
     async def send_status_message(self, message: str) -> bool:
@@ -109,8 +186,7 @@ class TelegramPublisher:
         try:
             await self.bot.send_message(
                 chat_id=self.chat_id,
-                text=message,
-                parse_mode='Markdown'
+                text=message
             )
             return True
         except Exception as e:
@@ -137,13 +213,8 @@ class TelegramPublisher:
             # Handle both old and new tweet formats
             if "post_id" in tweet:
                 # New format
-                tweet_id = tweet["post_id"]
-                text = tweet["post_text"]
-                author_username = tweet["author_username"]
-                author_name = tweet["author_name"]
-                classification = tweet["classification"]
-                url = tweet["post_url"]
-                media_urls = tweet.get("media_urls", [])
+                tweet_id, text, author_username, author_name, classification, url = _TWEET_FIELDS(tweet)
+                media_urls = tweet.get("media_urls") or ()
                 
                 # Create caption with structured format - classification in header
                 # For X/Twitter, use full text without truncation (tweets are already limited by platform)
@@ -156,26 +227,28 @@ class TelegramPublisher:
                     logger.info(f"Processing {len(media_urls)} media items for tweet {tweet_id}")
                     # Send first media with caption
                     media_url = media_urls[0]
+                    # Sent instead when the media can't be attached
+                    fallback_text = f"{caption}\n\n📎 Media: {media_url}"
                     logger.info(f"Attempting to send media: {media_url}")
                     
                     # Improved media type detection
-                    media_url_lower = media_url.lower()
+                    media_kind = _media_kind(media_url)
+                    if media_kind == 'unknown':
+                        media_kind = await self._probe_media_kind(media_url)
                     try:
-                        if any(ext in media_url_lower for ext in ['.jpg', '.jpeg', '.png', '.gif', 'format=jpg', 'format=png']):
+                        if media_kind == 'photo':
                             logger.info("Sending as photo")
                             await self.bot.send_photo(
                                 chat_id=self.chat_id,
                                 photo=media_url,
-                                caption=caption,
-                                parse_mode='Markdown'
+                                caption=caption
                             )
-                        elif any(ext in media_url_lower for ext in ['.mp4', '.mov', '.avi', 'format=mp4']):
+                        elif media_kind == 'video':
                             logger.info("Sending as video")
                             await self.bot.send_video(
                                 chat_id=self.chat_id,
                                 video=media_url,
-                                caption=caption,
-                                parse_mode='Markdown'
+                                caption=caption
                             )
                         else:
                             # Try as photo first (most common), fallback to text
@@ -184,34 +257,27 @@ class TelegramPublisher:
                                 await self.bot.send_photo(
                                     chat_id=self.chat_id,
                                     photo=media_url,
-                                    caption=caption,
-                                    parse_mode='Markdown'
+                                    caption=caption
                                 )
                             except Exception as photo_error:
                                 logger.warning(f"Failed to send as photo: {photo_error}, falling back to text")
                                 await self.bot.send_message(
                                     chat_id=self.chat_id,
-                                    text=f"{caption}\n\n📎 Media: {media_url}",
-                                    parse_mode='Markdown',
-                                    disable_web_page_preview=True
+                                    text=fallback_text
                                 )
                     except Exception as media_error:
                         logger.error(f"Failed to send media {media_url}: {media_error}")
                         # Fallback to text with media link
                         await self.bot.send_message(
                             chat_id=self.chat_id,
-                            text=f"{caption}\n\n📎 Media: {media_url}",
-                            parse_mode='Markdown',
-                            disable_web_page_preview=True
+                            text=fallback_text
                         )
                 else:
                     logger.info("No media found, sending as text")
                     # No media, send as text message
                     await self.bot.send_message(
                         chat_id=self.chat_id,
-                        text=caption,
-                        parse_mode='Markdown',
-                        disable_web_page_preview=True
+                        text=caption
                     )
             else:
                 # Old format (backward compatibility)
@@ -222,9 +288,7 @@ class TelegramPublisher:
                 
                 await self.bot.send_message(
                     chat_id=self.chat_id,
-                    text=message,
-                    parse_mode='Markdown',
-                    disable_web_page_preview=True
+                    text=message
                 )
             
             logger.info(f"Successfully sent tweet: {tweet_id}")
@@ -234,4 +298,9 @@ class TelegramPublisher:
             return False
         except Exception as e:
             logger.error(f"Error sending tweet: {e}")
-            return False 
\ No newline at end of file
+            return False
+
+@lru_cache(maxsize=None)
+def get_publisher() -> TelegramPublisher:
+    """Return the process-wide publisher; close it only at shutdown"""
+    return TelegramPublisher()